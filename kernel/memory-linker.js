@@ -546,6 +546,24 @@ if (require.main === module) {
       console.log(JSON.stringify(result, null, 2));
       break;
 
+    case 'store-batch': {
+      // Store many notes in one process: echo '[{"content", "type", "tags"}]' | node memory-linker.js store-batch
+      let batch;
+      try {
+        batch = JSON.parse(fs.readFileSync(0, 'utf8'));
+      } catch (e) {
+        console.error('Usage: memory-linker.js store-batch < notes.json  (JSON array of {content, type, tags})');
+        process.exit(1);
+      }
+      const results = [];
+      for (const item of Array.isArray(batch) ? batch : []) {
+        if (!item || !item.content) continue;
+        results.push(storeWithEvolution(item.content, item.type || 'fact', item.tags || []));
+      }
+      console.log(JSON.stringify({ stored: results.length, results }, null, 2));
+      break;
+    }
+
     case 'recall':
       // Recall notes: node memory-linker.js recall "query" [limit]
       const query = args[1];
@@ -592,6 +610,7 @@ if (require.main === module) {
       console.log('');
       console.log('Commands:');
       console.log('  store "content" [type] [tags...]  - Store note with auto-linking');
+      console.log('  store-batch < notes.json          - Store a JSON array of notes from stdin');
       console.log('  recall "query" [limit]            - Search notes by relevance');
       console.log('  graph [centerId] [depth]          - Get graph visualization data');
       console.log('  stats                             - Memory statistics');
@@ -47,6 +47,13 @@ CONFIG_DIR = CLAUDE_DIR / "config"
 
 WATCH_PATHS = [DATA_DIR, KERNEL_DIR]
 
+# SSE keep-alive pings only matter when an intermediary may drop idle streams.
+# Served directly on localhost (or behind a proxy with e.g. nginx
+# `proxy_read_timeout 600s;`) they are pure overhead, so they are opt-in.
+SSE_PING_ENABLED = os.environ.get("SSE_PING_ENABLED", "").lower() in ("1", "true", "yes")
+SSE_PING_INTERVAL = 30.0
+SSE_KEEPALIVE_TIMEOUT = 600
+
 # Load pricing from centralized config
 import sys as _sys
 _sys.path.insert(0, str(Path.home() / ".claude/config"))
@@ -895,16 +902,25 @@ async def api_all():
 # SSE ENDPOINT
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Ping frames have a fixed shape; splice the timestamp in instead of json.dumps
+_PING_PREFIX = 'data: {"type": "ping", "ts": "'
+_PING_SUFFIX = '"}\n\n'
+
+
 async def event_generator() -> AsyncGenerator[str, None]:
     yield f"data: {json.dumps({'type': 'connected', 'ts': datetime.now().isoformat()})}\n\n"
 
     while True:
         try:
+            if not SSE_PING_ENABLED:
+                event = await event_queue.get()
+                yield f"data: {json.dumps(event)}\n\n"
+                continue
             try:
-                event = await asyncio.wait_for(event_queue.get(), timeout=30.0)
+                event = await asyncio.wait_for(event_queue.get(), timeout=SSE_PING_INTERVAL)
                 yield f"data: {json.dumps(event)}\n\n"
             except asyncio.TimeoutError:
-                yield f"data: {json.dumps({'type': 'ping', 'ts': datetime.now().isoformat()})}\n\n"
+                yield _PING_PREFIX + datetime.now().isoformat() + _PING_SUFFIX
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -916,7 +932,12 @@ async def live_stream(request: Request):
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"}
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Keep-Alive": f"timeout={SSE_KEEPALIVE_TIMEOUT}",
+            "X-Accel-Buffering": "no",
+        }
     )
 
 
@@ -924,17 +945,8 @@ async def live_stream(request: Request):
 # SERVE ORIGINAL DASHBOARD WITH LIVE UPDATES
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@app.get("/", response_class=HTMLResponse)
-async def dashboard():
-    """Serve the dashboard - generates fresh data each time."""
-    # Read the original generated dashboard
-    dashboard_file = CLAUDE_DIR / "dashboard" / "claude-command-center.html"
-
-    if dashboard_file.exists():
-        html = dashboard_file.read_text()
-
-        # Inject SSE script for live updates
-        sse_script = '''
+# Injected once into the generated dashboard for live updates
+SSE_SCRIPT = '''
 <script>
 // Command Center 2.0 - Live Updates
 (function() {
@@ -979,9 +991,25 @@ async def dashboard():
 })();
 </script>
 '''
-        # Inject before </body>
-        html = html.replace('</body>', sse_script + '</body>')
-        return HTMLResponse(html)
+
+# Injected HTML cached by dashboard file mtime (rebuilt only when ccc regenerates it)
+_DASHBOARD_CACHE = {"mtime": 0, "html": b""}
+
+
+@app.get("/", response_class=HTMLResponse)
+async def dashboard():
+    """Serve the dashboard with the live SSE script injected (cached until the file's mtime changes)."""
+    # Read the original generated dashboard
+    dashboard_file = CLAUDE_DIR / "dashboard" / "claude-command-center.html"
+
+    if dashboard_file.exists():
+        mtime = dashboard_file.stat().st_mtime
+        if mtime != _DASHBOARD_CACHE["mtime"]:
+            # Inject before </body>
+            html = dashboard_file.read_text().replace('</body>', SSE_SCRIPT + '</body>')
+            _DASHBOARD_CACHE["html"] = html.encode()
+            _DASHBOARD_CACHE["mtime"] = mtime
+        return HTMLResponse(content=_DASHBOARD_CACHE["html"])
 
     # Fallback - regenerate dashboard
     return HTMLResponse("""
@@ -8,70 +8,165 @@ Extracts data from session transcripts to populate:
 """
 
 import json
+import mmap
 import os
 import glob
 import subprocess
 from datetime import datetime
 from pathlib import Path
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import re
 
+# orjson (optional - falls back to stdlib json) for transcript and identity parsing
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 # Paths
 PROJECTS_DIR = Path.home() / ".claude" / "projects"
 KERNEL_DIR = Path.home() / ".claude" / "kernel"
 IDENTITY_FILE = KERNEL_DIR / "identity.json"
 DQ_SCORES_FILE = KERNEL_DIR / "dq-scores.jsonl"
 
+# Per-transcript caps: topic frequencies saturate long before the end of huge files
+MAX_FILE_BYTES = 32 * 1024 * 1024
+MAX_ENTRIES_PER_FILE = 5000
+
+# Compact JSONL encoding, same layout as dq-scorer.js JSON.stringify
+_DQ_SEPARATORS = (',', ':')
+
+# Expertise domain mappings
+DOMAIN_KEYWORDS = {
+    'react': ['react', 'component', 'hooks', 'usestate', 'useeffect', 'jsx'],
+    'typescript': ['typescript', 'types', 'interface', 'generic'],
+    'python': ['python', 'pytest', 'django', 'flask', 'numpy', 'pandas'],
+    'testing': ['test', 'testing', 'jest', 'vitest', 'pytest', 'mock'],
+    'git': ['git', 'commit', 'branch', 'merge', 'rebase', 'push'],
+    'debugging': ['debug', 'error', 'fix', 'issue', 'problem', 'stack'],
+    'architecture': ['architecture', 'design', 'pattern', 'system', 'structure'],
+    'api': ['api', 'endpoint', 'request', 'response', 'fetch', 'http'],
+    'database': ['database', 'query', 'sql', 'schema', 'table', 'index'],
+    'routing': ['routing', 'route', 'model', 'haiku', 'sonnet', 'opus']
+}
+
+# Reverse index: keyword -> domains it scores (a keyword may feed several, e.g. pytest)
+_KW_TO_DOMAINS = {}
+for _domain, _keywords in DOMAIN_KEYWORDS.items():
+    for _kw in _keywords:
+        _KW_TO_DOMAINS.setdefault(_kw, []).append(_domain)
+
+# Parsed identity.json, reused until the file's mtime changes
+_IDENTITY_CACHE = {"mtime": None, "data": None}
+
+# Query keywords: 4+ letter words (applied to lowercased content)
+_WORD_RE = re.compile(r'\b[a-z]{4,}\b')
+
+def _iter_transcripts(root):
+    """Yield paths (as str) of all .jsonl files under root via os.scandir."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_transcripts(entry.path)
+                elif entry.name.endswith('.jsonl'):
+                    yield entry.path
+    except OSError:
+        return
+
+def _iter_lines(path, max_bytes):
+    """Yield raw byte lines from the first max_bytes of a file (mmap + find, no decoding)."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = min(size, max_bytes)
+            start = 0
+            find = mm.find
+            while start < end:
+                nl = find(b'\n', start, end)
+                if nl == -1:
+                    yield mm[start:end]
+                    return
+                yield mm[start:nl]
+                start = nl + 1
+
+def _process_one(transcript):
+    """Extract topic and model counts from a single transcript.
+
+    Returns (topics, model_usage), or None if the file could not be read.
+    """
+    topics = {}  # plain dict tally; merged into the shared Counter once per file
+    topics_get = topics.get
+    model_usage = defaultdict(int)
+
+    try:
+        parsed = 0
+        for line in _iter_lines(transcript, MAX_FILE_BYTES):
+            # Only user/assistant entries feed the counts; skip parsing the rest
+            if not line or (b'"user"' not in line and b'"assistant"' not in line):
+                continue
+            if parsed >= MAX_ENTRIES_PER_FILE:
+                break
+            parsed += 1
+            try:
+                entry = _loads(line)
+
+                # Extract user queries
+                if entry.get('type') == 'user':
+                    msg = entry.get('message', {})
+                    content = msg.get('content', '')
+                    if isinstance(content, str) and len(content) > 10:
+                        # Extract keywords from query
+                        for word in _WORD_RE.findall(content.lower()):
+                            topics[word] = topics_get(word, 0) + 1
+
+                # Extract assistant tool usage for model hints
+                if entry.get('type') == 'assistant':
+                    msg = entry.get('message', {})
+                    model = msg.get('model', '')
+                    if model:
+                        model_name = model.split('-')[1] if '-' in model else model
+                        if model_name in ['haiku', 'sonnet', 'opus']:
+                            model_usage[model_name] += 1
+
+                # Extract tool results for insights
+                if entry.get('type') == 'tool_result':
+                    content = entry.get('content', '')
+                    if isinstance(content, str) and 'error' in content.lower():
+                        # Potential error pattern
+                        pass
+
+            except ValueError:  # JSONDecodeError or undecodable bytes
+                continue
+    except Exception:
+        return None
+
+    return topics, dict(model_usage)
+
 def extract_from_transcripts(limit=100):
     """Extract data from session transcripts."""
 
-    transcripts = list(PROJECTS_DIR.glob("**/*.jsonl"))
+    transcripts = list(_iter_transcripts(PROJECTS_DIR))
     print(f"Found {len(transcripts)} transcript files")
 
     # Data collectors
     model_usage = defaultdict(int)
     topics = Counter()
-    insights = []
-    queries_by_model = defaultdict(list)
 
+    # Files are independent: fan out across cores, merge the reduced counts
     processed = 0
-    for transcript in transcripts[-limit:]:  # Process last N transcripts
-        try:
-            with open(transcript) as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-
-                        # Extract user queries
-                        if entry.get('type') == 'user':
-                            msg = entry.get('message', {})
-                            content = msg.get('content', '')
-                            if isinstance(content, str) and len(content) > 10:
-                                # Extract keywords from query
-                                words = re.findall(r'\b[a-zA-Z]{4,}\b', content.lower())
-                                topics.update(words)
-
-                        # Extract assistant tool usage for model hints
-                        if entry.get('type') == 'assistant':
-                            msg = entry.get('message', {})
-                            model = msg.get('model', '')
-                            if model:
-                                model_name = model.split('-')[1] if '-' in model else model
-                                if model_name in ['haiku', 'sonnet', 'opus']:
-                                    model_usage[model_name] += 1
-
-                        # Extract tool results for insights
-                        if entry.get('type') == 'tool_result':
-                            content = entry.get('content', '')
-                            if isinstance(content, str) and 'error' in content.lower():
-                                # Potential error pattern
-                                pass
-
-                    except json.JSONDecodeError:
-                        continue
+    with ProcessPoolExecutor() as ex:
+        for result in ex.map(_process_one, transcripts[-limit:], chunksize=4):  # Process last N transcripts
+            if result is None:
+                continue
+            file_topics, file_models = result
+            topics.update(file_topics)
+            for model, count in file_models.items():
+                model_usage[model] += count
             processed += 1
-        except Exception as e:
-            continue
 
     print(f"Processed {processed} transcripts")
 
@@ -81,41 +176,42 @@ def extract_from_transcripts(limit=100):
         'total_queries': sum(model_usage.values())
     }
 
+def _load_identity():
+    """Load identity.json, re-parsing only when the file has changed."""
+    mtime = IDENTITY_FILE.stat().st_mtime
+    if mtime != _IDENTITY_CACHE["mtime"]:
+        _IDENTITY_CACHE["data"] = _loads(IDENTITY_FILE.read_bytes())
+        _IDENTITY_CACHE["mtime"] = mtime
+    return _IDENTITY_CACHE["data"]
+
 def backfill_identity_expertise(topics):
     """Update identity manager with expertise domains from topics."""
 
-    # Define domain mappings
-    domain_keywords = {
-        'react': ['react', 'component', 'hooks', 'usestate', 'useeffect', 'jsx'],
-        'typescript': ['typescript', 'types', 'interface', 'generic'],
-        'python': ['python', 'pytest', 'django', 'flask', 'numpy', 'pandas'],
-        'testing': ['test', 'testing', 'jest', 'vitest', 'pytest', 'mock'],
-        'git': ['git', 'commit', 'branch', 'merge', 'rebase', 'push'],
-        'debugging': ['debug', 'error', 'fix', 'issue', 'problem', 'stack'],
-        'architecture': ['architecture', 'design', 'pattern', 'system', 'structure'],
-        'api': ['api', 'endpoint', 'request', 'response', 'fetch', 'http'],
-        'database': ['database', 'query', 'sql', 'schema', 'table', 'index'],
-        'routing': ['routing', 'route', 'model', 'haiku', 'sonnet', 'opus']
-    }
-
     # Calculate domain confidence based on topic frequency
-    domain_confidence = {}
-    topic_dict = dict(topics)
+    # (single pass over observed topics via the keyword -> domains index)
+    scores = defaultdict(int)
+    for word, count in topics:
+        for domain in _KW_TO_DOMAINS.get(word, ()):
+            scores[domain] += count
 
-    for domain, keywords in domain_keywords.items():
-        score = sum(topic_dict.get(kw, 0) for kw in keywords)
+    domain_confidence = {}
+    for domain in DOMAIN_KEYWORDS:
+        score = scores.get(domain, 0)
         if score > 0:
             # Normalize to 0-1 range
             domain_confidence[domain] = min(score / 100, 1.0)
 
     # Update identity file
     if IDENTITY_FILE.exists():
-        identity = json.loads(IDENTITY_FILE.read_text())
+        identity = _load_identity()
 
-        # Update expertise
+        # Update expertise (set mirror of the domain list for O(1) membership)
+        domains = identity['expertise']['domains']
+        existing = set(domains)
         for domain, confidence in domain_confidence.items():
-            if domain not in identity['expertise']['domains']:
-                identity['expertise']['domains'].append(domain)
+            if domain not in existing:
+                domains.append(domain)
+                existing.add(domain)
             identity['expertise']['confidence'][domain] = round(confidence, 3)
 
         # Update statistics
@@ -125,6 +221,7 @@ def backfill_identity_expertise(topics):
         )
 
         IDENTITY_FILE.write_text(json.dumps(identity, indent=2))
+        _IDENTITY_CACHE["mtime"] = IDENTITY_FILE.stat().st_mtime
         print(f"Updated identity with {len(domain_confidence)} expertise domains")
         return domain_confidence
 
@@ -154,18 +251,21 @@ def backfill_memory_insights(topics):
         }
     ]
 
+    # One node process for all insights (store-batch reads a JSON array on stdin)
     stored = 0
-    for insight in insights:
-        try:
-            result = subprocess.run(
-                ['node', str(KERNEL_DIR / 'memory-linker.js'), 'store',
-                 insight['content'], insight['type']] + insight['tags'],
-                capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                stored += 1
-        except:
-            continue
+    try:
+        result = subprocess.run(
+            ['node', str(KERNEL_DIR / 'memory-linker.js'), 'store-batch'],
+            input=json.dumps(insights), capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0:
+            stored = json.loads(result.stdout).get('stored', 0)
+        else:
+            print(f"memory-linker store-batch exited {result.returncode}: {result.stderr.strip()}")
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"memory-linker store-batch failed: {e}")
+    except ValueError as e:
+        print(f"memory-linker store-batch returned unparseable output: {e}")
 
     print(f"Stored {stored} insights in memory linker")
     return stored
@@ -198,12 +298,14 @@ def backfill_dq_scores(model_usage, total_queries):
                     'complexity': dq_estimates[model] * 0.9,
                     'source': 'backfill'
                 }
-                entries.append(json.dumps(entry))
-
-    # Append to DQ scores
-    with open(DQ_SCORES_FILE, 'a') as f:
-        for entry in entries:
-            f.write(entry + '\n')
+                entries.append(entry)
+
+    # Append to DQ scores in a single write
+    if entries:
+        with open(DQ_SCORES_FILE, 'a') as f:
+            # One encoder for the whole batch (json.dumps builds one per call with custom separators)
+            encode = json.JSONEncoder(separators=_DQ_SEPARATORS).encode
+            f.write('\n'.join(map(encode, entries)) + '\n')
 
     print(f"Added {len(entries)} backfilled DQ score entries")
     return len(entries)
@@ -17,6 +17,13 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+# PyObjC (optional - falls back to osascript)
+try:
+    from Foundation import NSUserNotification, NSUserNotificationCenter
+    PYOBJC_AVAILABLE = True
+except ImportError:
+    PYOBJC_AVAILABLE = False
+
 HOME = Path.home()
 CONFIG_FILE = HOME / ".claude/config/system.json"
 COST_FILE = HOME / ".claude/kernel/cost-data.json"
@@ -50,6 +57,19 @@ def load_cost_data():
 
 def send_notification(title: str, message: str):
     """Send macOS notification."""
+    if PYOBJC_AVAILABLE:
+        # Post in-process; avoids forking osascript per alert.
+        # The center is None for an unbundled python3, so fall through to osascript.
+        try:
+            center = NSUserNotificationCenter.defaultUserNotificationCenter()
+            if center is not None:
+                notification = NSUserNotification.alloc().init()
+                notification.setTitle_(title)
+                notification.setInformativeText_(message)
+                center.deliverNotification_(notification)
+                return True
+        except Exception:
+            pass
     try:
         subprocess.run([
             "osascript", "-e",
@@ -71,24 +91,31 @@ def log_alert(level: str, message: str):
     except:
         pass
 
-def check_already_alerted(alert_key: str) -> bool:
-    """Check if we already sent this alert today."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    key = f"{today}:{alert_key}"
-
+def load_alert_state() -> set:
+    """Read the set of alerts already sent (one "date:key" per line)."""
     if ALERT_STATE.exists():
         try:
-            alerts = ALERT_STATE.read_text().strip().split("\n")
-            return key in alerts
+            return set(ALERT_STATE.read_text().splitlines())
         except:
             pass
-    return False
+    return set()
+
+def check_already_alerted(alert_key: str, already: set = None) -> bool:
+    """Check if we already sent this alert today."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    key = f"{today}:{alert_key}"
+
+    if already is None:
+        already = load_alert_state()
+    return key in already
 
-def mark_alerted(alert_key: str):
+def mark_alerted(alert_key: str, already: set = None):
     """Mark alert as sent."""
     today = datetime.now().strftime("%Y-%m-%d")
     key = f"{today}:{alert_key}"
 
+    if already is not None:
+        already.add(key)
     try:
         ALERT_STATE.parent.mkdir(parents=True, exist_ok=True)
         with open(ALERT_STATE, "a") as f:
@@ -110,32 +137,33 @@ def check_alerts():
     cache_eff = cost_data.get("cacheEfficiency", 100)
 
     alerts_sent = 0
+    already = load_alert_state()  # parsed once for all three checks
 
     # Daily spend alert
     if today_cost > daily_threshold:
-        if not check_already_alerted("daily_spend"):
+        if not check_already_alerted("daily_spend", already):
             msg = f"Daily spend ${today_cost:.2f} exceeds ${daily_threshold}"
             log_alert("WARN", msg)
             send_notification("💰 CCC Cost Alert", msg)
-            mark_alerted("daily_spend")
+            mark_alerted("daily_spend", already)
             alerts_sent += 1
 
     # Weekly spend alert
     if week_cost > weekly_threshold:
-        if not check_already_alerted("weekly_spend"):
+        if not check_already_alerted("weekly_spend", already):
             msg = f"Weekly spend ${week_cost:.2f} exceeds ${weekly_threshold}"
             log_alert("WARN", msg)
             send_notification("💰 CCC Weekly Alert", msg)
-            mark_alerted("weekly_spend")
+            mark_alerted("weekly_spend", already)
             alerts_sent += 1
 
     # Cache efficiency alert
     if cache_eff < cache_threshold:
-        if not check_already_alerted("cache_efficiency"):
+        if not check_already_alerted("cache_efficiency", already):
             msg = f"Cache efficiency {cache_eff}% below {cache_threshold}%"
             log_alert("WARN", msg)
             send_notification("⚠️ CCC Cache Alert", msg)
-            mark_alerted("cache_efficiency")
+            mark_alerted("cache_efficiency", already)
             alerts_sent += 1
 
     return alerts_sent
@@ -11,15 +11,25 @@ Usage:
     python3 daily-memory-log.py --all               # All available data
 """
 
-import json
 import os
 import sys
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from heapq import nlargest
+from operator import itemgetter
+import multiprocessing
 import re
 
+# orjson (optional - falls back to stdlib json)
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 # Paths
 DATA_DIR = Path.home() / ".claude" / "data"
 OUTPUT_DIR = Path.home() / ".claude" / "memory" / "daily"
@@ -35,11 +45,51 @@ SOURCES = {
     "tool_usage": DATA_DIR / "tool-usage.jsonl",
 }
 
+# Above this many dates (--all / --backfill), logs are rendered in worker processes
+PARALLEL_MIN_DATES = 4
+
 # User notes marker
 NOTES_MARKER = "## Notes"
 NOTES_START = "<!-- USER_NOTES_START -->"
 NOTES_END = "<!-- USER_NOTES_END -->"
 
+# Model family display names, in match priority order (case-insensitive substring of the raw id)
+_MODEL_NAMES = {"opus": "Opus", "sonnet": "Sonnet", "haiku": "Haiku"}
+
+
+# Files up to this size are read in one go; larger ones are streamed in chunks
+BULK_READ_LIMIT = 64 * 1024 * 1024
+READ_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def iter_jsonl_lines(filepath: Path):
+    """Yield the raw byte lines of a JSONL file (empty lines skipped)."""
+    if filepath.stat().st_size <= BULK_READ_LIMIT:
+        for line in filepath.read_bytes().split(b"\n"):
+            if line:
+                yield line
+        return
+
+    # Chunked read; the partial trailing line is carried in a bytearray
+    # (in-place appends, no O(n^2) bytes concatenation)
+    pending = bytearray()
+    with open(filepath, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            cut = chunk.rfind(b"\n")
+            if cut == -1:
+                pending += chunk
+                continue
+            pending += chunk[:cut]
+            for line in pending.split(b"\n"):
+                if line:
+                    yield line
+            pending = bytearray(chunk[cut + 1:])
+    if pending:
+        yield pending
+
 
 def read_jsonl(filepath: Path) -> list:
     """Read JSONL file and return list of records."""
@@ -47,56 +97,100 @@ def read_jsonl(filepath: Path) -> list:
     if not filepath.exists():
         return records
 
-    with open(filepath, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                records.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
+    append = records.append
+    for line in iter_jsonl_lines(filepath):
+        try:
+            append(_loads(line))
+        except ValueError:  # bad JSON or undecodable bytes
+            continue
     return records
 
 
+# Every UTC offset (DST included) is a multiple of 15 minutes, so all timestamps in
+# the same 900s slot share a local date and hour. Key on the integer slot and only
+# build a datetime once per slot instead of once per record.
+_SLOT_SECONDS = 900
+_SLOT_LABELS = {}
+
+
+def _slot_labels(ts) -> tuple:
+    """Return (date "YYYY-MM-DD", local hour int) for a Unix timestamp."""
+    slot = int(ts // _SLOT_SECONDS)
+    labels = _SLOT_LABELS.get(slot)
+    if labels is None:
+        dt = datetime.fromtimestamp(slot * _SLOT_SECONDS)
+        labels = _SLOT_LABELS[slot] = (dt.strftime("%Y-%m-%d"), dt.hour)
+    return labels
+
+
 def get_date_from_ts(ts) -> str:
     """Convert Unix timestamp to date string YYYY-MM-DD."""
-    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+    return _slot_labels(ts)[0]
+
+
+def get_record_date(r: dict):
+    """Derive a record's YYYY-MM-DD date from its ts, date or timestamp field."""
+    # Try ts field first
+    if "ts" in r:
+        return get_date_from_ts(r["ts"])
+    # Try date field
+    if "date" in r:
+        return r["date"]
+    # Try timestamp field
+    if "timestamp" in r:
+        try:
+            dt = datetime.fromisoformat(r["timestamp"].replace("Z", "+00:00"))
+            return dt.strftime("%Y-%m-%d")
+        except (ValueError, AttributeError):
+            pass
+    return None
 
 
 def filter_by_date(records: list, target_date: str) -> list:
     """Filter records to only include those from target_date."""
-    filtered = []
-    for r in records:
-        # Try ts field first
+    return [r for r in records if get_record_date(r) == target_date]
+
+
+def load_all_bucketed(filepath: Path) -> dict:
+    """Read a JSONL file once and group its records by date."""
+    buckets = defaultdict(list)
+    slot_labels = _SLOT_LABELS.get
+    for r in read_jsonl(filepath):
         if "ts" in r:
-            if get_date_from_ts(r["ts"]) == target_date:
-                filtered.append(r)
-        # Try date field
-        elif "date" in r:
-            if r["date"] == target_date:
-                filtered.append(r)
-        # Try timestamp field
-        elif "timestamp" in r:
-            try:
-                dt = datetime.fromisoformat(r["timestamp"].replace("Z", "+00:00"))
-                if dt.strftime("%Y-%m-%d") == target_date:
-                    filtered.append(r)
-            except (ValueError, AttributeError):
-                pass
-    return filtered
+            # Inline slot-cache hit; fall back to the full lookup on a miss
+            ts = r["ts"]
+            labels = slot_labels(int(ts // _SLOT_SECONDS))
+            date = labels[0] if labels is not None else get_date_from_ts(ts)
+        else:
+            date = get_record_date(r)
+        if date is not None:
+            buckets[date].append(r)
+    return dict(buckets)
+
+
+# Parsed sources bucketed by date: {source_name: {date: [records]}}.
+# Filled once per run so multi-date runs (--all, --backfill) parse each file once.
+_BUCKETS = {}
+
+
+def load_sources() -> dict:
+    """Parse every JSONL source once (cached for the rest of the run)."""
+    if not _BUCKETS:
+        for name, source_path in SOURCES.items():
+            _BUCKETS[name] = load_all_bucketed(source_path)
+    return _BUCKETS
 
 
 def extract_user_notes(existing_content: str) -> str:
     """Extract user notes from existing log to preserve them."""
-    if NOTES_START in existing_content and NOTES_END in existing_content:
-        start = existing_content.index(NOTES_START) + len(NOTES_START)
-        end = existing_content.index(NOTES_END)
-        return existing_content[start:end].strip()
+    start = existing_content.find(NOTES_START)
+    end = existing_content.find(NOTES_END)
+    if start != -1 and end != -1:
+        return existing_content[start + len(NOTES_START):end].strip()
 
     # Legacy format: extract content after ## Notes
-    if NOTES_MARKER in existing_content:
-        idx = existing_content.index(NOTES_MARKER)
+    idx = existing_content.find(NOTES_MARKER)
+    if idx != -1:
         notes_section = existing_content[idx + len(NOTES_MARKER):].strip()
         # Remove default placeholder if present
         if notes_section == "_User annotations_":
@@ -106,92 +200,92 @@ def extract_user_notes(existing_content: str) -> str:
     return ""
 
 
+def file_suffix(path: str) -> str:
+    """Path(path).suffix without building a Path ("" for "foo." and dotfiles)."""
+    ext = os.path.splitext(path.rstrip("/"))[1]
+    return "" if ext == "." else ext
+
+
 def generate_daily_log(target_date: str) -> str:
     """Generate markdown log for a specific date."""
 
-    # Load all data
-    session_outcomes = filter_by_date(read_jsonl(SOURCES["session_outcomes"]), target_date)
-    cost_data = filter_by_date(read_jsonl(SOURCES["cost_tracking"]), target_date)
-    errors = filter_by_date(read_jsonl(SOURCES["errors"]), target_date)
-    git_activity = filter_by_date(read_jsonl(SOURCES["git_activity"]), target_date)
-    session_events = filter_by_date(read_jsonl(SOURCES["session_events"]), target_date)
-    productivity = filter_by_date(read_jsonl(SOURCES["productivity"]), target_date)
-    tool_usage = filter_by_date(read_jsonl(SOURCES["tool_usage"]), target_date)
-
-    # Analyze sessions
-    session_starts = [e for e in session_events if e.get("event") == "session_start"]
-    session_ends = [e for e in session_events if e.get("event") == "session_end"]
+    # Load all data (parsed once, then a per-date lookup)
+    buckets = load_sources()
+    session_outcomes = buckets["session_outcomes"].get(target_date, [])
+    cost_data = buckets["cost_tracking"].get(target_date, [])
+    errors = buckets["errors"].get(target_date, [])
+    git_activity = buckets["git_activity"].get(target_date, [])
+    session_events = buckets["session_events"].get(target_date, [])
+    productivity = buckets["productivity"].get(target_date, [])
+    tool_usage = buckets["tool_usage"].get(target_date, [])
+
+    # Analyze sessions: one pass over outcomes for counts, quality and files
+    outcome_counts = Counter()
+    qualities = []
+    all_files = set()
+    for s in session_outcomes:
+        outcome_counts[s.get("outcome")] += 1
+        quality = s.get("quality")
+        if quality:
+            qualities.append(quality)
+        all_files.update(s.get("files_modified", []))
 
-    successful = len([s for s in session_outcomes if s.get("outcome") == "success"])
-    partial = len([s for s in session_outcomes if s.get("outcome") == "partial"])
-    abandoned = len([s for s in session_outcomes if s.get("outcome") == "abandoned"])
-    total_sessions = max(len(session_starts), len(session_outcomes), 1)
+    successful = outcome_counts["success"]
+    partial = outcome_counts["partial"]
+    abandoned = outcome_counts["abandoned"]
 
     # Calculate quality
-    qualities = [s.get("quality", 0) for s in session_outcomes if s.get("quality")]
     avg_quality = sum(qualities) / len(qualities) if qualities else 0
 
-    # Calculate working hours from session events
+    # One pass over session events for starts and working hours
+    session_start_count = 0
     hours_set = set()
     for e in session_events:
+        if e.get("event") == "session_start":
+            session_start_count += 1
         if "ts" in e:
-            hour = datetime.fromtimestamp(e["ts"]).strftime("%H:00")
-            hours_set.add(hour)
+            hours_set.add(_slot_labels(e["ts"])[1])
+
+    total_sessions = max(session_start_count, len(session_outcomes), 1)
 
     if hours_set:
-        sorted_hours = sorted(hours_set)
-        working_hours = f"{sorted_hours[0]} - {sorted_hours[-1]}"
+        working_hours = f"{min(hours_set):02d}:00 - {max(hours_set):02d}:00"
     else:
         working_hours = "N/A"
 
-    # Aggregate costs by model
-    model_costs = defaultdict(lambda: {"cost": 0, "tokens_in": 0, "tokens_out": 0, "cache_reads": 0})
+    # Aggregate costs by model: model_key -> [cost, tokens_in, tokens_out, cache_reads]
+    model_costs = {}
     for c in cost_data:
         model = c.get("model", "unknown")
         # Simplify model name
-        if "opus" in model.lower():
-            model_key = "Opus"
-        elif "sonnet" in model.lower():
-            model_key = "Sonnet"
-        elif "haiku" in model.lower():
-            model_key = "Haiku"
-        else:
-            model_key = model
+        low = model.lower()
+        model_key = next((name for family, name in _MODEL_NAMES.items() if family in low), model)
 
-        model_costs[model_key]["cost"] += c.get("cost_usd", 0)
+        slot = model_costs.get(model_key)
+        if slot is None:
+            slot = model_costs[model_key] = [0, 0, 0, 0]
         tokens = c.get("tokens", {})
-        model_costs[model_key]["tokens_in"] += tokens.get("input", 0)
-        model_costs[model_key]["tokens_out"] += tokens.get("output", 0)
-        model_costs[model_key]["cache_reads"] += tokens.get("cache_read", 0)
-
-    # Calculate cache efficiency
-    total_input = sum(m["tokens_in"] for m in model_costs.values())
-    total_cache = sum(m["cache_reads"] for m in model_costs.values())
+        slot[0] += c.get("cost_usd", 0)
+        slot[1] += tokens.get("input", 0)
+        slot[2] += tokens.get("output", 0)
+        slot[3] += tokens.get("cache_read", 0)
+
+    # Totals and cache efficiency (one pass over the per-model slots)
+    total_cost = total_input = total_cache = 0
+    for cost, tokens_in, _, cache_reads in model_costs.values():
+        total_cost += cost
+        total_input += tokens_in
+        total_cache += cache_reads
     overall_cache_pct = (total_cache / (total_input + total_cache) * 100) if (total_input + total_cache) > 0 else 0
 
     # Aggregate errors by category
-    error_cats = defaultdict(int)
-    for e in errors:
-        cat = e.get("category", "unknown")
-        error_cats[cat] += 1
+    error_cats = Counter(e.get("category", "unknown") for e in errors)
 
     # Aggregate git activity by repo
-    repo_commits = defaultdict(int)
-    for g in git_activity:
-        repo = g.get("repo", "unknown")
-        repo_commits[repo] += 1
+    repo_commits = Counter(g.get("repo", "unknown") for g in git_activity)
 
     # Tool usage stats
-    tool_counts = defaultdict(int)
-    for t in tool_usage:
-        tool = t.get("tool", "unknown")
-        tool_counts[tool] += 1
-
-    # Get files modified from session outcomes
-    all_files = set()
-    for s in session_outcomes:
-        for f in s.get("files_modified", []):
-            all_files.add(f)
+    tool_counts = Counter(t.get("tool", "unknown") for t in tool_usage)
 
     # Build markdown
     lines = [
@@ -199,6 +293,7 @@ def generate_daily_log(target_date: str) -> str:
         "",
         "## Session Summary",
     ]
+    add = lines.append
 
     outcome_parts = []
     if successful:
@@ -209,131 +304,120 @@ def generate_daily_log(target_date: str) -> str:
         outcome_parts.append(f"{abandoned} abandoned")
     outcome_str = ", ".join(outcome_parts) if outcome_parts else "none tracked"
 
-    lines.extend([
-        f"- **Sessions:** {total_sessions} ({outcome_str})",
-        f"- **Working Hours:** {working_hours}",
-        f"- **Avg Quality:** {avg_quality:.1f}/5" if avg_quality else "- **Avg Quality:** N/A",
-        "",
-    ])
+    add(f"- **Sessions:** {total_sessions} ({outcome_str})")
+    add(f"- **Working Hours:** {working_hours}")
+    add(f"- **Avg Quality:** {avg_quality:.1f}/5" if avg_quality else "- **Avg Quality:** N/A")
+    add("")
 
     # Cost section
     if model_costs:
-        lines.extend([
-            "## Cost & Efficiency",
-            "",
-            "| Model | Cost | Cache % |",
-            "|-------|------|---------|",
-        ])
+        add("## Cost & Efficiency")
+        add("")
+        add("| Model | Cost | Cache % |")
+        add("|-------|------|---------|")
 
         for model, data in sorted(model_costs.items()):
-            input_total = data["tokens_in"] + data["cache_reads"]
-            cache_pct = (data["cache_reads"] / input_total * 100) if input_total > 0 else 0
-            lines.append(f"| {model} | ${data['cost']:.2f} | {cache_pct:.0f}% |")
+            cost, tokens_in, _, cache_reads = data
+            input_total = tokens_in + cache_reads
+            cache_pct = (cache_reads / input_total * 100) if input_total > 0 else 0
+            add(f"| {model} | ${cost:.2f} | {cache_pct:.0f}% |")
 
-        total_cost = sum(m["cost"] for m in model_costs.values())
-        lines.extend([
-            "",
-            f"**Total:** ${total_cost:.2f} | **Overall Cache:** {overall_cache_pct:.0f}%",
-            "",
-        ])
+        add("")
+        add(f"**Total:** ${total_cost:.2f} | **Overall Cache:** {overall_cache_pct:.0f}%")
+        add("")
 
     # Errors section
     if error_cats:
-        lines.extend([
-            "## Errors",
-            "",
-        ])
+        add("## Errors")
+        add("")
         error_total = sum(error_cats.values())
         error_breakdown = ", ".join(f"{cat}: {cnt}" for cat, cnt in sorted(error_cats.items()))
-        lines.extend([
-            f"- **Total:** {error_total} ({error_breakdown})",
-            "",
-        ])
+        add(f"- **Total:** {error_total} ({error_breakdown})")
+        add("")
 
     # Git activity
     if repo_commits:
-        lines.extend([
-            "## Git Activity",
-            "",
-        ])
+        add("## Git Activity")
+        add("")
         commit_total = sum(repo_commits.values())
         repo_breakdown = ", ".join(f"{repo} ({cnt})" for repo, cnt in sorted(repo_commits.items(), key=lambda x: -x[1]))
-        lines.extend([
-            f"- **Commits:** {commit_total}",
-            f"- **Repos:** {repo_breakdown}",
-            "",
-        ])
+        add(f"- **Commits:** {commit_total}")
+        add(f"- **Repos:** {repo_breakdown}")
+        add("")
 
     # Tool usage
     if tool_counts:
-        lines.extend([
-            "## Tool Usage",
-            "",
-            "| Tool | Count |",
-            "|------|-------|",
-        ])
-        for tool, count in sorted(tool_counts.items(), key=lambda x: -x[1])[:10]:
-            lines.append(f"| {tool} | {count} |")
-        lines.append("")
+        add("## Tool Usage")
+        add("")
+        add("| Tool | Count |")
+        add("|------|-------|")
+        for tool, count in nlargest(10, tool_counts.items(), key=itemgetter(1)):
+            add(f"| {tool} | {count} |")
+        add("")
 
     # Files modified
     if all_files:
-        lines.extend([
-            "## Files Modified",
-            "",
-            f"**Total:** {len(all_files)} files",
-            "",
-        ])
+        add("## Files Modified")
+        add("")
+        add(f"**Total:** {len(all_files)} files")
+        add("")
         # Group by extension
-        ext_counts = defaultdict(int)
-        for f in all_files:
-            ext = Path(f).suffix or "(no ext)"
-            ext_counts[ext] += 1
+        ext_counts = Counter(file_suffix(f) or "(no ext)" for f in all_files)
 
-        ext_breakdown = ", ".join(f"{ext}: {cnt}" for ext, cnt in sorted(ext_counts.items(), key=lambda x: -x[1])[:5])
-        lines.append(f"By type: {ext_breakdown}")
-        lines.append("")
+        ext_breakdown = ", ".join(f"{ext}: {cnt}" for ext, cnt in nlargest(5, ext_counts.items(), key=itemgetter(1)))
+        add(f"By type: {ext_breakdown}")
+        add("")
 
     # Session details (collapsible)
     if session_outcomes:
-        lines.extend([
-            "<details>",
-            "<summary>Session Details</summary>",
-            "",
-        ])
+        add("<details>")
+        add("<summary>Session Details</summary>")
+        add("")
         for s in session_outcomes:
             title = s.get("title") or "Untitled"
             title = title[:60]
             outcome = s.get("outcome", "unknown")
             quality = s.get("quality", "?")
-            lines.append(f"- **{title}...** → {outcome} (Q: {quality})")
-        lines.extend([
-            "",
-            "</details>",
-            "",
-        ])
+            add(f"- **{title}...** → {outcome} (Q: {quality})")
+        add("")
+        add("</details>")
+        add("")
 
     # Notes section (preserved across regenerations)
-    lines.extend([
-        NOTES_MARKER,
-        "",
-        NOTES_START,
-        "",
-        NOTES_END,
-        "",
-    ])
+    add(NOTES_MARKER)
+    add("")
+    add(NOTES_START)
+    add("")
+    add(NOTES_END)
+    add("")
 
     return "\n".join(lines)
 
 
-def write_log(target_date: str, preserve_notes: bool = True) -> Path:
-    """Write log file, preserving user notes if they exist."""
+def existing_log_names() -> set:
+    """Names of log files already in OUTPUT_DIR (one directory scan)."""
+    try:
+        with os.scandir(OUTPUT_DIR) as it:
+            return {entry.name for entry in it if entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def write_log(target_date: str, preserve_notes: bool = True, existing: set = None) -> Path:
+    """Write log file, preserving user notes if they exist.
+
+    existing: optional set from existing_log_names(), to skip the per-file stat.
+    """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     output_path = OUTPUT_DIR / f"{target_date}.md"
 
     # Check for existing notes
     existing_notes = ""
-    if preserve_notes and output_path.exists():
+    if existing is not None:
+        has_log = output_path.name in existing
+    else:
+        has_log = output_path.exists()
+    if preserve_notes and has_log:
         existing_notes = extract_user_notes(output_path.read_text())
 
     # Generate new content
@@ -353,22 +437,8 @@ def write_log(target_date: str, preserve_notes: bool = True) -> Path:
 def get_available_dates() -> set:
     """Get all dates that have data in any JSONL file."""
     dates = set()
-
-    for source_path in SOURCES.values():
-        if not source_path.exists():
-            continue
-
-        for record in read_jsonl(source_path):
-            if "ts" in record:
-                dates.add(get_date_from_ts(record["ts"]))
-            elif "date" in record:
-                dates.add(record["date"])
-            elif "timestamp" in record:
-                try:
-                    dt = datetime.fromisoformat(record["timestamp"].replace("Z", "+00:00"))
-                    dates.add(dt.strftime("%Y-%m-%d"))
-                except (ValueError, AttributeError):
-                    pass
+    for buckets in load_sources().values():
+        dates.update(buckets)
 
     return dates
 
@@ -398,10 +468,28 @@ def main():
         # Default: today
         dates_to_process = [datetime.now().strftime("%Y-%m-%d")]
 
-    for date in dates_to_process:
-        output_path = write_log(date)
-        if not args.quiet:
-            print(f"Generated: {output_path}")
+    existing = existing_log_names()
+    write = partial(write_log, existing=existing)
+    ctx = None
+    if len(dates_to_process) > PARALLEL_MIN_DATES:
+        try:
+            # fork: workers inherit the parsed _BUCKETS (spawn/forkserver would re-parse every source)
+            ctx = multiprocessing.get_context("fork")
+        except ValueError:
+            pass
+    if ctx is not None:
+        # Dates are independent: parse sources before forking, render in workers
+        load_sources()
+        with ProcessPoolExecutor(mp_context=ctx) as ex:
+            output_paths = ex.map(write, dates_to_process, chunksize=8)
+            for output_path in output_paths:
+                if not args.quiet:
+                    print(f"Generated: {output_path}")
+    else:
+        for date in dates_to_process:
+            output_path = write(date)
+            if not args.quiet:
+                print(f"Generated: {output_path}")
 
     if not args.quiet and len(dates_to_process) > 1:
         print(f"\nTotal: {len(dates_to_process)} logs generated")
@@ -6,24 +6,80 @@ Created: 2026-01-28
 """
 
 import sqlite3
+import sys
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime
 
 DB_PATH = Path.home() / '.claude/data/claude.db'
 
+# Composite (timestamp, group-by column) indexes: every dashboard query filters
+# on timestamp and then groups by one of these, so the scan is served by the index.
+DASHBOARD_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_tool_ts_name ON tool_events(timestamp, tool_name, success)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_ts_type ON activity_events(timestamp, event_type)",
+    "CREATE INDEX IF NOT EXISTS idx_routing_ts_model ON routing_events(timestamp, chosen_model)",
+    "CREATE INDEX IF NOT EXISTS idx_outcome_ts_session ON session_outcome_events(timestamp, session_id)",
+]
+
+# Query results: list of row dicts, or {column: [values...]} when columnar=True
+Rows = Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+
+def fetch_columnar(cursor: sqlite3.Cursor) -> Dict[str, List[Any]]:
+    """Fetch all rows as column lists: {column: [values...]}"""
+    cols = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+    if not rows:
+        return {c: [] for c in cols}
+    return {c: list(values) for c, values in zip(cols, zip(*rows))}
+
 class DashboardData:
     """Helper class for dashboard SQLite queries"""
 
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or DB_PATH
-        self.conn = sqlite3.connect(str(self.db_path))
+        # Autocommit mode: read-only helper, transactions are opened explicitly
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None)
         self.conn.row_factory = sqlite3.Row  # Dict-like row access
+        try:
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA temp_store=MEMORY")
+            self.conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        except sqlite3.Error:
+            # DB held exclusively by a writer: keep the connection defaults
+            pass
+
+    def ensure_indexes(self):
+        """Create the dashboard indexes and gather planner stats once (writer/migration path)"""
+        for sql in DASHBOARD_INDEXES:
+            try:
+                self.conn.execute(sql)
+            except sqlite3.Error as e:
+                print(f"Skipped index ({e}): {sql}", file=sys.stderr)
+        try:
+            has_stats = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone()
+            if not has_stats:
+                self.conn.execute("ANALYZE")
+        except sqlite3.Error as e:
+            print(f"Skipped ANALYZE: {e}", file=sys.stderr)
 
     def close(self):
         """Close database connection"""
         self.conn.close()
 
+    def _rows(self, cursor: sqlite3.Cursor, columnar: bool) -> Rows:
+        """Rows as a list of dicts, or as column lists when columnar=True"""
+        if columnar:
+            return fetch_columnar(cursor)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _cutoff(self, days: int) -> int:
+        """Unix timestamp N days before now (integer seconds, no datetime round-trip)"""
+        return int(time.time()) - days * 86400
+
     def __enter__(self):
         return self
 
@@ -33,16 +89,16 @@ class DashboardData:
     # Tool Usage Queries
     # ==================
 
-    def get_tool_usage_summary(self, days: int = 7) -> List[Dict[str, Any]]:
+    def get_tool_usage_summary(self, days: int = 7, columnar: bool = False) -> Rows:
         """Get tool usage summary for last N days"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT
                 tool_name,
                 COUNT(*) as total_calls,
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as success_count,
-                SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as failure_count,
+                SUM(success) as success_count,
+                COUNT(*) - SUM(success) as failure_count,
                 AVG(duration_ms) as avg_duration_ms,
                 MAX(timestamp) as last_used
             FROM tool_events
@@ -51,11 +107,11 @@ class DashboardData:
             ORDER BY total_calls DESC
         """, (cutoff,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
-    def get_tool_events(self, tool_name: Optional[str] = None, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_tool_events(self, tool_name: Optional[str] = None, days: int = 7, limit: int = 100, columnar: bool = False) -> Rows:
         """Get recent tool events, optionally filtered by tool name"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         if tool_name:
             cursor = self.conn.execute("""
@@ -72,16 +128,16 @@ class DashboardData:
                 LIMIT ?
             """, (cutoff, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
     def get_tool_success_rate(self, days: int = 7) -> Dict[str, float]:
         """Get success rate by tool for last N days"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT
                 tool_name,
-                CAST(SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) AS FLOAT) / COUNT(*) * 100 as success_rate
+                CAST(SUM(success) AS FLOAT) / COUNT(*) * 100 as success_rate
             FROM tool_events
             WHERE timestamp > ?
             GROUP BY tool_name
@@ -94,9 +150,9 @@ class DashboardData:
     # Activity Queries
     # ================
 
-    def get_activity_timeline(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_activity_timeline(self, days: int = 7, limit: int = 100, columnar: bool = False) -> Rows:
         """Get recent activity events"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT * FROM activity_events
@@ -105,11 +161,11 @@ class DashboardData:
             LIMIT ?
         """, (cutoff, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
-    def get_activity_by_type(self, days: int = 7) -> List[Dict[str, Any]]:
+    def get_activity_by_type(self, days: int = 7, columnar: bool = False) -> Rows:
         """Get activity counts by event type"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT
@@ -121,11 +177,11 @@ class DashboardData:
             ORDER BY count DESC
         """, (cutoff,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
-    def get_hourly_activity(self, days: int = 7) -> List[Dict[str, Any]]:
+    def get_hourly_activity(self, days: int = 7, columnar: bool = False) -> Rows:
         """Get activity grouped by hour"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT
@@ -137,14 +193,14 @@ class DashboardData:
             ORDER BY hour DESC
         """, (cutoff,))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
     # Routing Queries
     # ===============
 
-    def get_routing_decisions(self, days: int = 7, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_routing_decisions(self, days: int = 7, limit: int = 100, columnar: bool = False) -> Rows:
         """Get recent routing decisions"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT * FROM routing_events
@@ -153,11 +209,11 @@ class DashboardData:
             LIMIT ?
         """, (cutoff, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
     def get_model_distribution(self, days: int = 7) -> Dict[str, int]:
         """Get model usage distribution"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT
@@ -173,7 +229,7 @@ class DashboardData:
 
     def get_avg_dq_score(self, days: int = 7) -> Optional[float]:
         """Get average DQ score"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT AVG(dq_score) as avg_dq
@@ -186,7 +242,7 @@ class DashboardData:
 
     def get_avg_complexity(self, days: int = 7) -> Optional[float]:
         """Get average complexity score"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT AVG(complexity) as avg_complexity
@@ -200,9 +256,9 @@ class DashboardData:
     # Session Queries
     # ===============
 
-    def get_session_outcomes(self, days: int = 7, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_session_outcomes(self, days: int = 7, limit: int = 50, columnar: bool = False) -> Rows:
         """Get recent session outcomes"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT * FROM session_outcome_events
@@ -211,11 +267,11 @@ class DashboardData:
             LIMIT ?
         """, (cutoff, limit))
 
-        return [dict(row) for row in cursor.fetchall()]
+        return self._rows(cursor, columnar)
 
     def get_avg_session_quality(self, days: int = 7) -> Optional[float]:
         """Get average session quality score"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT AVG(quality_score) as avg_quality
@@ -228,7 +284,7 @@ class DashboardData:
 
     def get_session_count(self, days: int = 7) -> int:
         """Get total session count"""
-        cutoff = int((datetime.now() - timedelta(days=days)).timestamp())
+        cutoff = self._cutoff(days)
 
         cursor = self.conn.execute("""
             SELECT COUNT(DISTINCT session_id) as count
@@ -244,51 +300,56 @@ class DashboardData:
 
     def get_dashboard_summary(self, days: int = 7) -> Dict[str, Any]:
         """Get comprehensive dashboard summary"""
-        cutoff_ts = int((datetime.now() - timedelta(days=days)).timestamp())
-
-        # Tool usage stats
-        tool_cursor = self.conn.execute("""
-            SELECT
-                COUNT(DISTINCT tool_name) as unique_tools,
-                COUNT(*) as total_tool_calls,
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful_calls,
-                AVG(duration_ms) as avg_duration
-            FROM tool_events
-            WHERE timestamp > ?
-        """, (cutoff_ts,))
-        tool_stats = dict(tool_cursor.fetchone())
-
-        # Activity stats
-        activity_cursor = self.conn.execute("""
-            SELECT
-                COUNT(*) as total_events,
-                COUNT(DISTINCT event_type) as unique_event_types
-            FROM activity_events
-            WHERE timestamp > ?
-        """, (cutoff_ts,))
-        activity_stats = dict(activity_cursor.fetchone())
-
-        # Routing stats
-        routing_cursor = self.conn.execute("""
-            SELECT
-                COUNT(*) as total_decisions,
-                AVG(dq_score) as avg_dq_score,
-                AVG(complexity) as avg_complexity
-            FROM routing_events
-            WHERE timestamp > ?
-        """, (cutoff_ts,))
-        routing_stats = dict(routing_cursor.fetchone())
-
-        # Session stats
-        session_cursor = self.conn.execute("""
-            SELECT
-                COUNT(DISTINCT session_id) as total_sessions,
-                AVG(quality_score) as avg_quality,
-                AVG(message_count) as avg_messages
-            FROM session_outcome_events
-            WHERE timestamp > ?
-        """, (cutoff_ts,))
-        session_stats = dict(session_cursor.fetchone())
+        cutoff_ts = self._cutoff(days)
+
+        # One read transaction: a single lock/snapshot for all four queries
+        self.conn.execute("BEGIN")
+        try:
+            # Tool usage stats
+            tool_cursor = self.conn.execute("""
+                SELECT
+                    COUNT(DISTINCT tool_name) as unique_tools,
+                    COUNT(*) as total_tool_calls,
+                    SUM(success) as successful_calls,
+                    AVG(duration_ms) as avg_duration
+                FROM tool_events
+                WHERE timestamp > ?
+            """, (cutoff_ts,))
+            tool_stats = dict(tool_cursor.fetchone())
+
+            # Activity stats
+            activity_cursor = self.conn.execute("""
+                SELECT
+                    COUNT(*) as total_events,
+                    COUNT(DISTINCT event_type) as unique_event_types
+                FROM activity_events
+                WHERE timestamp > ?
+            """, (cutoff_ts,))
+            activity_stats = dict(activity_cursor.fetchone())
+
+            # Routing stats
+            routing_cursor = self.conn.execute("""
+                SELECT
+                    COUNT(*) as total_decisions,
+                    AVG(dq_score) as avg_dq_score,
+                    AVG(complexity) as avg_complexity
+                FROM routing_events
+                WHERE timestamp > ?
+            """, (cutoff_ts,))
+            routing_stats = dict(routing_cursor.fetchone())
+
+            # Session stats
+            session_cursor = self.conn.execute("""
+                SELECT
+                    COUNT(DISTINCT session_id) as total_sessions,
+                    AVG(quality_score) as avg_quality,
+                    AVG(message_count) as avg_messages
+                FROM session_outcome_events
+                WHERE timestamp > ?
+            """, (cutoff_ts,))
+            session_stats = dict(session_cursor.fetchone())
+        finally:
+            self.conn.execute("COMMIT")
 
         return {
             'period_days': days,
@@ -305,7 +366,6 @@ class DashboardData:
 def main():
     """CLI interface for testing queries"""
     import json
-    import sys
 
     if len(sys.argv) < 2:
         print("Usage: dashboard-sql-loader.py <query> [days]")
@@ -315,11 +375,17 @@ def main():
         print("  routing           - Routing decisions")
         print("  sessions          - Session outcomes")
         print("  summary           - Full dashboard summary")
+        print("  ensure_indexes    - Create dashboard indexes (writer/migration use)")
         sys.exit(1)
 
     query_type = sys.argv[1]
     days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
 
+    if query_type == 'ensure_indexes':
+        with DashboardData() as db:
+            db.ensure_indexes()
+        return
+
     with DashboardData() as db:
         if query_type == 'tool_usage':
             data = db.get_tool_usage_summary(days)
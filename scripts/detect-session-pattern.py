@@ -5,12 +5,19 @@ Detects patterns from recent session and updates trends.
 """
 
 import json
+import os
 import re
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import Counter
 
+HOME = Path.home()
+KERNEL_DIR = HOME / ".claude/kernel"
+TRENDS_FILE = KERNEL_DIR / "pattern-trends.json"
+HISTORY_FILE = KERNEL_DIR / "pattern-history.jsonl"
+OUTCOMES_FILE = HOME / ".claude/data/session-outcomes.jsonl"
+
 PATTERNS = {
     "architecture": ["architect", "design", "structure", "system", "refactor", "plan", "component"],
     "research": ["research", "explore", "investigate", "understand", "analyze", "find", "search", "how does"],
@@ -31,31 +38,29 @@ ICONS = {
 }
 
 
+# Flattened (keyword, pattern) pairs in PATTERNS order, so ties keep the same winner
+_KEYWORDS = [(kw, pid) for pid, keywords in PATTERNS.items() for kw in keywords]
+
+
 def detect_pattern(text: str) -> str:
     """Detect primary pattern from text."""
     text = text.lower()
-    scores = {}
-
-    for pid, keywords in PATTERNS.items():
-        score = sum(1 for kw in keywords if kw in text)
-        if score > 0:
-            scores[pid] = score
+    scores = Counter(pid for kw, pid in _KEYWORDS if kw in text)
 
     if scores:
-        return max(scores, key=scores.get)
+        return scores.most_common(1)[0][0]
     return "implementation"  # default
 
 
-def update_trends(pattern: str, date: str):
+def update_trends(pattern: str, date: str, now: datetime = None):
     """Update pattern trends file."""
-    home = Path.home()
-    trends_file = home / ".claude/kernel/pattern-trends.json"
+    now = now or datetime.now()
 
     trends = {"daily": {}, "weekly": {}, "top_patterns": [], "percentages": {}, "all_time": {}, "total_sessions": 0}
 
-    if trends_file.exists():
+    if TRENDS_FILE.exists():
         try:
-            with open(trends_file) as f:
+            with open(TRENDS_FILE) as f:
                 trends = json.load(f)
         except:
             pass
@@ -88,16 +93,19 @@ def update_trends(pattern: str, date: str):
             for p, c in sorted(trends.get("all_time", {}).items(), key=lambda x: x[1], reverse=True)
         ]
 
-    trends["generated"] = datetime.now().isoformat()
+    trends["generated"] = now.isoformat()
 
-    with open(trends_file, "w") as f:
-        json.dump(trends, f, indent=2)
+    # Compact, machine-read file; written to a temp file and swapped in atomically
+    tmp_file = TRENDS_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(trends, f, separators=(",", ":"))
+    os.replace(tmp_file, TRENDS_FILE)
 
 
-def log_pattern(session_id: str, pattern: str, date: str, messages: int = 0, tools: int = 0):
+def log_pattern(session_id: str, pattern: str, date: str, messages: int = 0, tools: int = 0,
+                now: datetime = None):
     """Log pattern to history file."""
-    home = Path.home()
-    history_file = home / ".claude/kernel/pattern-history.jsonl"
+    now = now or datetime.now()
 
     entry = {
         "date": date,
@@ -105,17 +113,18 @@ def log_pattern(session_id: str, pattern: str, date: str, messages: int = 0, too
         "patterns": [{"id": pattern, "icon": ICONS.get(pattern, "📊"), "confidence": 1.0}],
         "messages": messages,
         "tools": tools,
-        "detected_at": datetime.now().isoformat()
+        "detected_at": now.isoformat()
     }
 
-    with open(history_file, "a") as f:
+    with open(HISTORY_FILE, "a") as f:
         f.write(json.dumps(entry) + "\n")
 
 
 def main():
     # Get session context from stdin or args
+    now = datetime.now()
     context = ""
-    session_id = f"session-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    session_id = f"session-{now.strftime('%Y%m%d-%H%M%S')}"
     messages = 0
     tools = 0
 
@@ -123,10 +132,9 @@ def main():
         context = " ".join(sys.argv[1:])
     else:
         # Try to read from recent session outcomes
-        outcomes_file = Path.home() / ".claude/data/session-outcomes.jsonl"
-        if outcomes_file.exists():
+        if OUTCOMES_FILE.exists():
             try:
-                with open(outcomes_file) as f:
+                with open(OUTCOMES_FILE) as f:
                     lines = f.readlines()
                     if lines:
                         last = json.loads(lines[-1])
@@ -140,12 +148,12 @@ def main():
     if not context or len(context) < 5:
         return  # Nothing to detect
 
-    date = datetime.now().strftime("%Y-%m-%d")
+    date = now.strftime("%Y-%m-%d")
     pattern = detect_pattern(context)
 
     # Log and update
-    log_pattern(session_id, pattern, date, messages, tools)
-    update_trends(pattern, date)
+    log_pattern(session_id, pattern, date, messages, tools, now=now)
+    update_trends(pattern, date, now=now)
 
     print(f"{ICONS.get(pattern, '📊')} Pattern: {pattern}")
 
@@ -4,12 +4,14 @@ Error Backfill Script
 Scans all session data to extract historical errors and populate ERRORS.md
 """
 
+import mmap
 import os
 import re
 import json
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 HOME = Path.home()
 CLAUDE_DIR = HOME / '.claude'
@@ -17,6 +19,12 @@ AGENT_CORE = HOME / '.agent-core'
 ERRORS_MD = CLAUDE_DIR / 'ERRORS.md'
 ERRORS_JSONL = CLAUDE_DIR / 'data' / 'errors.jsonl'
 
+# File scans with at least this many files are spread across worker processes
+PARALLEL_MIN_FILES = 32
+
+# Larger agent-core/debug log files (e.g. multi-GB traces) are scanned from their last 50 MB only
+MAX_SCAN_BYTES = 50 * 1024 * 1024
+
 # Error patterns with categories
 ERROR_PATTERNS = [
     (r'error[:\s]', 'general', 'medium'),
@@ -73,20 +81,42 @@ EXCLUSIONS = [
     r'ErrorBoundary',
 ]
 
+# Compiled once: a fused alternation rejects most lines in a single search; on a hit
+# the per-pattern list is walked in order so the first listed pattern still wins.
+_EXCLUDE_RE = re.compile('|'.join(f'(?:{p})' for p in EXCLUSIONS), re.IGNORECASE)
+_ERROR_RE = re.compile('|'.join(f'(?:{p})' for p, _, _ in ERROR_PATTERNS), re.IGNORECASE)
+_COMPILED_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), pattern, category, severity)
+    for pattern, category, severity in ERROR_PATTERNS
+]
+
+# Bytes prefilter for whole-file scans (no decode pass). The trailing [:\s] class
+# is dropped so Unicode whitespace can't cause a miss; it only needs to be a superset.
+_ERROR_RE_B = re.compile(
+    b'|'.join(b'(?:' + re.sub(r'\[:\\s\]$', '', p).encode() + b')' for p, _, _ in ERROR_PATTERNS),
+    re.IGNORECASE
+)
+
+# activity.log prefilter: session headers (case-sensitive) or any error keyword
+_ACTIVITY_RE_B = re.compile(b'(?-i:SESSION)|' + _ERROR_RE_B.pattern, re.IGNORECASE)
+
+# Dates embedded in file/dir names: 2026-01-19 or 20260119
+_PATH_DATE_RE = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+# Date stamp on activity.log session header lines
+_SESSION_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
 def should_exclude(line):
     """Check if line should be excluded (false positive)"""
-    for pattern in EXCLUSIONS:
-        if re.search(pattern, line, re.IGNORECASE):
-            return True
-    return False
+    return _EXCLUDE_RE.search(line) is not None
 
 def detect_error(line):
     """Detect error category and severity from line"""
-    if should_exclude(line):
+    if not _ERROR_RE.search(line) or should_exclude(line):
         return None
 
-    for pattern, category, severity in ERROR_PATTERNS:
-        if re.search(pattern, line, re.IGNORECASE):
+    for regex, pattern, category, severity in _COMPILED_PATTERNS:
+        if regex.search(line):
             return {
                 'category': category,
                 'severity': severity,
@@ -97,11 +127,68 @@ def detect_error(line):
 def extract_date_from_path(path):
     """Extract date from file path"""
     # Try to find date patterns like 2026-01-19 or 20260119
-    match = re.search(r'(\d{4})-?(\d{2})-?(\d{2})', str(path))
+    match = _PATH_DATE_RE.search(str(path))
     if match:
         return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
     return datetime.now().strftime('%Y-%m-%d')
 
+def _iter_candidate_lines(path, max_bytes=None):
+    """Yield only the lines of a text file that contain an error keyword.
+
+    The file is searched as raw bytes; only lines around hits are decoded
+    (newlines normalised as in text mode), and detect_error still decides per line.
+    With max_bytes set, a larger file is searched from its last max_bytes only.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_bytes is not None and size > max_bytes:
+            f.seek(size - max_bytes)
+            f.readline()  # drop the partial first line
+        buf = f.read()
+    search = _ERROR_RE_B.search
+    pos = 0
+    while True:
+        m = search(buf, pos)
+        if not m:
+            return
+        start = buf.rfind(b'\n', 0, m.start()) + 1
+        end = buf.find(b'\n', m.start())
+        if end == -1:
+            end = len(buf)
+        text = buf[start:end].decode('utf-8', 'ignore')
+        if '\r' in text:
+            yield from text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        else:
+            yield text
+        pos = end + 1
+
+def _iter_activity_lines(buf):
+    """Yield the activity.log lines that may be session headers or errors.
+
+    buf is the raw log (bytes or mmap). Lines keep their trailing newline and
+    are split/decoded as text-mode iteration would, but only at hit sites.
+    """
+    search = _ACTIVITY_RE_B.search
+    rfind, find = buf.rfind, buf.find
+    size = len(buf)
+    pos = 0
+    while True:
+        m = search(buf, pos)
+        if not m:
+            return
+        start = rfind(b'\n', 0, m.start()) + 1
+        end = find(b'\n', m.start())
+        end = size if end == -1 else end + 1
+        text = buf[start:end].decode('utf-8', 'ignore')
+        if '\r' in text:
+            parts = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+            yield from (part + '\n' for part in parts[:-1])
+            if parts[-1]:
+                yield parts[-1]
+        else:
+            yield text
+        pos = end
+
 def scan_activity_log():
     """Scan activity.log for errors"""
     errors = []
@@ -110,21 +197,27 @@ def scan_activity_log():
     if not activity_log.exists():
         return errors
 
-    print(f"Scanning activity.log ({activity_log.stat().st_size / 1024:.1f} KB)...")
+    size = activity_log.stat().st_size
+    print(f"Scanning activity.log ({size / 1024:.1f} KB)...")
+    if not size:
+        return errors
 
     current_session = None
-    with open(activity_log, 'r', errors='ignore') as f:
-        for line in f:
+    today = datetime.now().strftime('%Y-%m-%d')
+    with open(activity_log, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        for line in _iter_activity_lines(mm):
             # Track session boundaries
             if 'SESSION' in line and 'PWD:' in line:
-                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line)
+                date_match = _SESSION_DATE_RE.search(line)
                 current_session = date_match.group(1) if date_match else None
                 continue
 
             error = detect_error(line)
             if error and error['severity'] in ('high', 'critical', 'medium'):
                 errors.append({
-                    'date': current_session or datetime.now().strftime('%Y-%m-%d'),
+                    'date': current_session or today,
                     'source': 'activity_log',
                     'line': line.strip()[:200],
                     **error
@@ -132,6 +225,48 @@ def scan_activity_log():
 
     return errors
 
+def _scan_file(task):
+    """Scan one text file for high/critical errors; task is (path, date, source, max_bytes)"""
+    path, date, source, max_bytes = task
+    errors = []
+    for line in _iter_candidate_lines(path, max_bytes):
+        error = detect_error(line)
+        if error and error['severity'] in ('high', 'critical'):
+            errors.append({
+                'date': date,
+                'source': source,
+                'line': line.strip()[:200],
+                **error
+            })
+    return errors
+
+def _scan_file_quiet(task):
+    """_scan_file, treating unreadable files as error-free"""
+    try:
+        return _scan_file(task)
+    except Exception:
+        return []
+
+def _scannable(entry):
+    """Non-empty regular file we can read (checked without opening it)"""
+    try:
+        return entry.is_file() and entry.stat().st_size > 0 and os.access(entry.path, os.R_OK)
+    except OSError:
+        return False
+
+def _scan_files(tasks, scan=_scan_file):
+    """Run scan over independent files, in worker processes for larger batches"""
+    errors = []
+    if len(tasks) < PARALLEL_MIN_FILES:
+        for file_errors in map(scan, tasks):
+            errors.extend(file_errors)
+        return errors
+
+    with ProcessPoolExecutor() as ex:
+        for file_errors in ex.map(scan, tasks, chunksize=8):
+            errors.extend(file_errors)
+    return errors
+
 def scan_session_summaries():
     """Scan session summaries for error mentions"""
     errors = []
@@ -140,23 +275,15 @@ def scan_session_summaries():
     if not summaries_dir.exists():
         return errors
 
-    print(f"Scanning {len(list(summaries_dir.glob('*.md')))} session summaries...")
-
-    for summary_file in summaries_dir.glob('*.md'):
-        date = extract_date_from_path(summary_file)
-        content = summary_file.read_text(errors='ignore')
-
-        for line in content.split('\n'):
-            error = detect_error(line)
-            if error and error['severity'] in ('high', 'critical'):
-                errors.append({
-                    'date': date,
-                    'source': f'session:{summary_file.name}',
-                    'line': line.strip()[:200],
-                    **error
-                })
+    with os.scandir(summaries_dir) as it:
+        tasks = [
+            (entry.path, extract_date_from_path(entry.path), f'session:{entry.name}', None)
+            for entry in it
+            if entry.name.endswith('.md') and entry.is_file()
+        ]
+    print(f"Scanning {len(tasks)} session summaries...")
 
-    return errors
+    return _scan_files(tasks)
 
 def scan_agent_core_sessions():
     """Scan agent-core sessions for errors"""
@@ -166,33 +293,25 @@ def scan_agent_core_sessions():
     if not sessions_dir.exists():
         return errors
 
-    session_dirs = list(sessions_dir.iterdir())
+    with os.scandir(sessions_dir) as it:
+        session_dirs = list(it)
     print(f"Scanning {len(session_dirs)} agent-core sessions...")
 
+    tasks = []
     for session_dir in session_dirs:
         if not session_dir.is_dir():
             continue
 
-        date = extract_date_from_path(session_dir)
+        date = extract_date_from_path(session_dir.path)
+        source = f'agent-core:{session_dir.name}'
 
         # Check session files
-        for file in session_dir.glob('*'):
-            if file.suffix in ('.md', '.txt', '.json', '.log'):
-                try:
-                    content = file.read_text(errors='ignore')
-                    for line in content.split('\n'):
-                        error = detect_error(line)
-                        if error and error['severity'] in ('high', 'critical'):
-                            errors.append({
-                                'date': date,
-                                'source': f'agent-core:{session_dir.name}',
-                                'line': line.strip()[:200],
-                                **error
-                            })
-                except Exception:
-                    pass
+        with os.scandir(session_dir.path) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1] in ('.md', '.txt', '.json', '.log') and _scannable(entry):
+                    tasks.append((entry.path, date, source, MAX_SCAN_BYTES))
 
-    return errors
+    return _scan_files(tasks, _scan_file_quiet)
 
 def scan_debug_logs():
     """Scan debug directory for errors"""
@@ -202,30 +321,19 @@ def scan_debug_logs():
     if not debug_dir.exists():
         return errors
 
-    debug_files = list(debug_dir.glob('*'))
+    with os.scandir(debug_dir) as it:
+        debug_files = list(it)
     print(f"Scanning {len(debug_files)} debug files...")
 
+    tasks = []
     for debug_file in debug_files[-50:]:  # Only recent 50
-        if not debug_file.is_file():
+        if not _scannable(debug_file):
             continue
 
-        date = extract_date_from_path(debug_file)
-
-        try:
-            content = debug_file.read_text(errors='ignore')
-            for line in content.split('\n'):
-                error = detect_error(line)
-                if error and error['severity'] in ('high', 'critical'):
-                    errors.append({
-                        'date': date,
-                        'source': f'debug:{debug_file.name[:30]}',
-                        'line': line.strip()[:200],
-                        **error
-                    })
-        except Exception:
-            pass
+        date = extract_date_from_path(debug_file.path)
+        tasks.append((debug_file.path, date, f'debug:{debug_file.name[:30]}', MAX_SCAN_BYTES))
 
-    return errors
+    return _scan_files(tasks, _scan_file_quiet)
 
 def deduplicate_errors(errors):
     """Deduplicate errors by content similarity"""
@@ -233,8 +341,8 @@ def deduplicate_errors(errors):
     unique = []
 
     for error in errors:
-        # Create a fingerprint
-        fingerprint = f"{error['category']}:{error['line'][:50]}"
+        # Fingerprint: (category, line prefix) tuple, no formatted key string
+        fingerprint = (error['category'], error['line'][:50])
         if fingerprint not in seen:
             seen.add(fingerprint)
             unique.append(error)
@@ -251,22 +359,31 @@ def aggregate_by_category(errors):
 def write_backfill_results(errors):
     """Write backfilled errors to ERRORS.md and errors.jsonl"""
 
-    # Write to jsonl
+    # Write to jsonl (one backfill timestamp for the whole batch, one write)
+    # The envelope fields are identical for every entry: serialise them once as a
+    # prefix and splice each error's own JSON object in after it
+    now = datetime.now()
+    envelope = json.dumps({
+        'ts': int(now.timestamp()),
+        'timestamp': now.isoformat(),
+        'backfilled': True,
+    })
+    prefix = envelope[:-1] + ', '
+    lines = [prefix + json.dumps(error)[1:] + '\n' for error in errors]
+
     ERRORS_JSONL.parent.mkdir(parents=True, exist_ok=True)
     with open(ERRORS_JSONL, 'a') as f:
-        for error in errors:
-            entry = {
-                'ts': int(datetime.now().timestamp()),
-                'timestamp': datetime.now().isoformat(),
-                'backfilled': True,
-                **error
-            }
-            f.write(json.dumps(entry) + '\n')
+        f.write(''.join(lines))
 
-    # Group by date and category for ERRORS.md
-    by_date = defaultdict(lambda: defaultdict(list))
+    # Group by (date, category) for ERRORS.md
+    by_date = {}
     for error in errors:
-        by_date[error['date']][error['category']].append(error)
+        key = (error['date'], error['category'])
+        group = by_date.get(key)
+        if group is None:
+            by_date[key] = [error]
+        else:
+            group.append(error)
 
     # Read current ERRORS.md
     content = ERRORS_MD.read_text()
@@ -277,27 +394,32 @@ def write_backfill_results(errors):
         insert_point = len(content)
 
     # Build new entries
-    new_entries = "\n## Backfilled Errors (Historical)\n\n"
+    parts = ["\n## Backfilled Errors (Historical)\n\n"]
 
-    for date in sorted(by_date.keys(), reverse=True):
-        categories = by_date[date]
-        for category, cat_errors in categories.items():
-            severity = max(e['severity'] for e in cat_errors)
-            count = len(cat_errors)
-            sample = cat_errors[0]['line'][:100]
+    # Newest date first; categories keep first-seen order within a date (stable sort)
+    for date, category in sorted(by_date, key=lambda k: k[0], reverse=True):
+        cat_errors = by_date[(date, category)]
+        severity = max(e['severity'] for e in cat_errors)
+        count = len(cat_errors)
+        sample = cat_errors[0]['line'][:100]
 
-            new_entries += f"""### {date} - {category} ({count} occurrences)
+        parts.append(f"""### {date} - {category} ({count} occurrences)
 **Category:** {category} | **Severity:** {severity}
 **Sample:** `{sample}...`
 **Source:** {cat_errors[0]['source']}
 
-"""
+""")
 
-    new_entries += "---\n\n"
+    parts.append("---\n\n")
+    new_entries = ''.join(parts)
 
-    # Insert into content
-    content = content[:insert_point] + new_entries + content[insert_point:]
-    ERRORS_MD.write_text(content)
+    # Splice into a temp file and swap it in (no concatenated copy, never half-written)
+    tmp_path = ERRORS_MD.with_suffix('.md.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(content[:insert_point])
+        f.write(new_entries)
+        f.write(content[insert_point:])
+    os.replace(tmp_path, ERRORS_MD)
 
 def main():
     print("=" * 50)
@@ -5,11 +5,22 @@ Comprehensive repair of all data sources used by ccc-generator.sh
 """
 
 import json
+import mmap
 import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import multiprocessing
+
+# orjson (optional - falls back to stdlib json) for all JSON parsing and the indented outputs
+try:
+    from orjson import loads as _loads, dumps as _dumps, OPT_INDENT_2, OPT_NON_STR_KEYS
+except ImportError:
+    from json import loads as _loads
+    _dumps = None
 
 # Import centralized pricing
 sys.path.insert(0, str(Path.home() / ".claude/config"))
@@ -17,11 +28,23 @@ from pricing import ESTIMATES as COSTS_PER_MSG, VERSION as PRICING_VERSION
 
 # Quiet mode for hooks
 QUIET = '--quiet' in sys.argv or '-q' in sys.argv
+# Rescan every transcript, ignoring the scan cache
+FULL_SCAN = '--full' in sys.argv
 
 def log(msg=""):
     if not QUIET:
         print(msg)
 
+def write_json(path, data):
+    """Write data to path as 2-space indented JSON"""
+    if _dumps is not None:
+        try:
+            path.write_bytes(_dumps(data, option=OPT_INDENT_2 | OPT_NON_STR_KEYS))
+            return
+        except TypeError:  # e.g. ints beyond 64 bits; let stdlib json handle it
+            pass
+    path.write_text(json.dumps(data, indent=2))
+
 log("=" * 70)
 log("FIX ALL DASHBOARD DATA")
 log("=" * 70)
@@ -33,180 +56,337 @@ KERNEL_DIR = CLAUDE_DIR / "kernel"
 DATA_DIR = CLAUDE_DIR / "data"
 MEMORY_DIR = CLAUDE_DIR / "memory"
 PROJECTS_DIR = CLAUDE_DIR / "projects"
+# Per-transcript STEP 1 results, keyed by path and reused while size and mtime match
+SCAN_CACHE_FILE = DATA_DIR / "transcript-scan-cache.json"
+# Bump whenever scan_transcript's result changes, so older cache entries are discarded
+SCAN_CACHE_VERSION = 2
+
+# Chunk size for the binary line counts (transcripts themselves are memory-mapped)
+READ_CHUNK = 1 << 20
+
+# Two-digit hour field -> session_hours bit, so the common case skips int() parsing
+_HOUR_BITS = {f"{h:02d}": 1 << h for h in range(100)}
+
+# Fan the transcript scan out to worker processes from this many files up
+PARALLEL_MIN_FILES = 32
 
 # Ensure directories
 KERNEL_DIR.mkdir(parents=True, exist_ok=True)
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 MEMORY_DIR.mkdir(parents=True, exist_ok=True)
 
-# ═══════════════════════════════════════════════════════════════════════════
-# STEP 1: SCAN ALL TRANSCRIPTS FOR RAW DATA
-# ═══════════════════════════════════════════════════════════════════════════
-
-log("STEP 1: Scanning transcripts...")
+@lru_cache(maxsize=64)
+def model_family(model):
+    """Model family of a model id ('opus', 'sonnet' or 'haiku'), or None"""
+    if 'opus' in model:
+        return 'opus'
+    if 'sonnet' in model:
+        return 'sonnet'
+    if 'haiku' in model:
+        return 'haiku'
+    return None
+
+def extract_title(message):
+    """First 100 chars of a user message's text, or None if it is too short to title a session"""
+    if isinstance(message, dict):
+        content = message.get('content', '')
+    else:
+        content = str(message)
+    if isinstance(content, list):
+        content = ' '.join([c.get('text', '') if type(c) is dict else str(c) for c in content])
+    if content and len(content) > 3:
+        return content[:100]
+    return None
+
+def _iter_lines(f):
+    """Yield the raw byte lines of an open binary file (mmap + find, newlines stripped)"""
+    if not os.fstat(f.fileno()).st_size:
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        end = len(mm)
+        start = 0
+        find = mm.find
+        while start < end:
+            nl = find(b'\n', start)
+            if nl == -1:
+                yield mm[start:end]
+                return
+            yield mm[start:nl]
+            start = nl + 1
+
+def scan_transcript(path):
+    """Per-file stats for STEP 1; None if the file cannot be opened.
+
+    Model, tool and token counts cover every parsed line, even when the session is dropped.
+    """
+    session_date = None
+    session_messages = 0
+    session_tools = 0
+    session_hours = 0  # Bitmask of hours active in this session
+    first_user_msg = None  # Extract title/intent from first user message
+    session_models = defaultdict(int)  # Track models used in this session
+    tool_counts = defaultdict(int)
+    has_error = False
+    # REAL token usage (cache_read, input, cache_create, output), summed from usage blocks
+    cache_read = input_tokens = cache_create = output_tokens = 0
 
-daily_stats = defaultdict(lambda: {"messages": 0, "sessions": 0, "tools": 0})
-model_counts = Counter()
-tool_counts = Counter()
-hour_counts = Counter()  # Track activity by hour
-total_sessions = 0
-total_messages = 0
-total_tools = 0
-
-# Track longest session
-longest_session = {"messageCount": 0, "date": None, "sessionId": None}
-all_sessions = []  # For tracking individual session stats
-
-for transcript in PROJECTS_DIR.glob("**/*.jsonl"):
     try:
-        session_date = None
-        session_messages = 0
-        session_tools = 0
-        session_hours = set()  # Track hours active in this session
-        first_user_msg = None  # Extract title/intent from first user message
-        session_models = Counter()  # Track models used in this session
-        has_error = False
-        last_outcome = None
-
-        with open(transcript, 'r', errors='ignore') as f:
-            for line in f:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    try:
+        with f:
+            for line in _iter_lines(f):
+                # Only timestamped, user/assistant or usage lines feed the stats; skip parsing the rest
+                has_usage = b'"usage"' in line
+                if (not has_usage and b'"timestamp"' not in line
+                        and b'"user"' not in line and b'"assistant"' not in line):
+                    continue
+                try:
+                    entry = _loads(line)
+                except (ValueError, RecursionError):  # malformed JSON or undecodable bytes
+                    continue
                 try:
-                    entry = json.loads(line)
-                    ts = entry.get('timestamp')
+                    get = entry.get
+                    ts = get('timestamp')
 
                     if ts:
                         if session_date is None:
                             session_date = ts[:10]
-                        # Extract hour from timestamp (format: 2026-01-19T14:30:00)
+                        # Extract hour from timestamp (format: 2026-01-19T14:30:00);
+                        # int() only for hour fields that are not two ASCII digits
                         try:
-                            hour = int(ts[11:13])
-                            session_hours.add(hour)
-                        except:
+                            session_hours |= _HOUR_BITS.get(ts[11:13]) or 1 << int(ts[11:13])
+                        except (ValueError, TypeError):
                             pass
 
-                    if entry.get('type') == 'user':
+                    kind = get('type')
+                    if kind == 'user':
                         session_messages += 1
                         # Capture first user message as title/intent
                         if first_user_msg is None:
-                            msg_content = entry.get('message', {})
-                            if isinstance(msg_content, dict):
-                                content = msg_content.get('content', '')
-                            else:
-                                content = str(msg_content)
-                            if isinstance(content, list):
-                                content = ' '.join([c.get('text', '') if isinstance(c, dict) else str(c) for c in content])
-                            if content and len(content) > 3:
-                                first_user_msg = content[:100]  # First 100 chars
-
-                    if entry.get('type') == 'assistant':
+                            first_user_msg = extract_title(get('message', {}))
+
+                    elif kind == 'assistant':
                         session_messages += 1
-                        msg = entry.get('message', {})
-                        model = msg.get('model', '')
-
-                        if 'opus' in model:
-                            model_counts['opus'] += 1
-                            session_models['opus'] += 1
-                        elif 'sonnet' in model:
-                            model_counts['sonnet'] += 1
-                            session_models['sonnet'] += 1
-                        elif 'haiku' in model:
-                            model_counts['haiku'] += 1
-                            session_models['haiku'] += 1
-
-                        content = msg.get('content', [])
+                        msg = get('message', {})
+                        msg_get = msg.get
+                        model = msg_get('model', '')
+
+                        family = model_family(model)
+                        if family:
+                            session_models[family] += 1
+
+                        content = msg_get('content', [])
                         if isinstance(content, list):
                             for item in content:
-                                if isinstance(item, dict) and item.get('type') == 'tool_use':
-                                    tool_name = item.get('name', 'unknown')
-                                    tool_counts[tool_name] += 1
+                                if type(item) is dict and item.get('type') == 'tool_use':
+                                    tool_counts[item.get('name', 'unknown')] += 1
                                     session_tools += 1
 
                         # Check for error indicators
-                        stop_reason = msg.get('stopReason', '')
+                        stop_reason = msg_get('stopReason', '')
                         if stop_reason == 'error':
                             has_error = True
 
-                except:
+                except (AttributeError, TypeError, KeyError):  # entry fields with unexpected shapes
                     pass
 
-        if session_date:
-            daily_stats[session_date]["sessions"] += 1
-            daily_stats[session_date]["messages"] += session_messages
-            daily_stats[session_date]["tools"] += session_tools
-            total_sessions += 1
-            total_messages += session_messages
-            total_tools += session_tools
+                if has_usage:
+                    try:
+                        usage = entry.get('message', {}).get('usage', {})
+                        if usage:
+                            cache_read += usage.get('cache_read_input_tokens', 0)
+                            input_tokens += usage.get('input_tokens', 0)
+                            cache_create += usage.get('cache_creation_input_tokens', 0)
+                            output_tokens += usage.get('output_tokens', 0)
+                    except (AttributeError, TypeError):
+                        pass
+    except OSError:
+        session_date = None  # Unreadable mid-way: keep the counts, drop the session
+    if not isinstance(session_date, str):
+        session_date = None  # e.g. a list timestamp; cannot key the per-date stats
+
+    return (session_date, session_messages, session_tools, session_hours,
+            first_user_msg, dict(session_models), has_error, dict(tool_counts),
+            (cache_read, input_tokens, cache_create, output_tokens))
+
+
+def _scan_transcripts(paths):
+    """Yield scan_transcript results in path order, in worker processes for larger batches"""
+    if len(paths) >= PARALLEL_MIN_FILES:
+        try:
+            # fork: workers inherit this module as-is (spawn would re-run the whole script)
+            ctx = multiprocessing.get_context('fork')
+        except ValueError:
+            ctx = None
+        if ctx is not None:
+            with ProcessPoolExecutor(mp_context=ctx) as ex:
+                yield from ex.map(scan_transcript, paths, chunksize=4)
+            return
+    yield from map(scan_transcript, paths)
+
+
+def load_scan_cache():
+    """Load {path: [size, mtime_ns, result]} from SCAN_CACHE_FILE ({} if missing, corrupt or stale)"""
+    if FULL_SCAN:
+        return {}
+    try:
+        with open(SCAN_CACHE_FILE, 'rb') as f:
+            cache = _loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != SCAN_CACHE_VERSION:
+        return {}
+    files = cache.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+def scan_transcripts_cached(paths):
+    """scan_transcript results for paths, rescanning only files changed since the last run"""
+    cache = load_scan_cache()
+    results = [None] * len(paths)
+    fresh = {}
+    stale = []
+    for i, path in enumerate(paths):
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        stamp = [st.st_size, st.st_mtime_ns]
+        hit = cache.get(key)
+        if hit and hit[:2] == stamp:
+            results[i] = tuple(hit[2])
+            fresh[key] = hit
+        else:
+            stale.append((i, key, stamp))
+
+    # stat() was taken before the scan, so a file that grows meanwhile is rescanned next run
+    for (i, key, stamp), result in zip(stale, _scan_transcripts([paths[i] for i, _, _ in stale])):
+        results[i] = result
+        if result is not None:
+            fresh[key] = stamp + [result]
+
+    tmp = SCAN_CACHE_FILE.with_suffix('.json.tmp')
+    try:
+        tmp.write_text(json.dumps({'version': SCAN_CACHE_VERSION, 'files': fresh}, separators=(',', ':')))
+        os.replace(tmp, SCAN_CACHE_FILE)
+    except OSError:
+        pass
+    return results
+
+
+def count_lines(path):
+    """Count lines like iterating the file would: newlines plus an unterminated last line"""
+    count = 0
+    tail = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            count += chunk.count(b'\n')
+            tail = chunk[-1:]
+    return count + (tail != b'\n')
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# STEP 1: SCAN ALL TRANSCRIPTS FOR RAW DATA
+# ═══════════════════════════════════════════════════════════════════════════
+
+log("STEP 1: Scanning transcripts...")
+
+# Per-date tallies (flat Counters keyed by date string)
+daily_sessions = Counter()
+daily_messages = Counter()
+daily_tools = Counter()
+model_counts = Counter()
+tool_counts = Counter()
+hour_counts = defaultdict(int)  # Track activity by hour
+total_sessions = 0
+total_messages = 0
+total_tools = 0
+
+# Track longest session as (messageCount, date, sessionId); first one wins ties
+longest = (0, None, None)
+all_sessions = []  # For tracking individual session stats
+# REAL token data from TRANSCRIPTS (not cost-tracking.jsonl which has inflated estimates)
+real_tokens = {"cache_read": 0, "input": 0, "cache_create": 0, "output": 0}
 
-            # Track hour activity
-            for hour in session_hours:
+transcripts = list(PROJECTS_DIR.glob("**/*.jsonl"))
+for transcript, result in zip(transcripts, scan_transcripts_cached(transcripts)):
+    if result is None:
+        continue
+    (session_date, session_messages, session_tools, session_hours,
+     first_user_msg, session_models, has_error, file_tools, file_tokens) = result
+    model_counts.update(session_models)
+    tool_counts.update(file_tools)
+    real_tokens["cache_read"] += file_tokens[0]
+    real_tokens["input"] += file_tokens[1]
+    real_tokens["cache_create"] += file_tokens[2]
+    real_tokens["output"] += file_tokens[3]
+
+    if session_date:
+        daily_sessions[session_date] += 1
+        daily_messages[session_date] += session_messages
+        daily_tools[session_date] += session_tools
+        total_sessions += 1
+        total_messages += session_messages
+        total_tools += session_tools
+
+        # Track hour activity
+        for hour in range(session_hours.bit_length()):
+            if session_hours >> hour & 1:
                 hour_counts[hour] += 1
 
-            # Track longest session
-            if session_messages > longest_session["messageCount"]:
-                longest_session = {
-                    "messageCount": session_messages,
-                    "date": session_date,
-                    "sessionId": str(transcript.name)[:20]
-                }
-
-            # Determine outcome based on session characteristics
-            if has_error:
-                outcome = 'error'
-            elif session_messages < 5:
-                outcome = 'abandoned'
-            elif session_tools > 10:
-                outcome = 'success'
-            elif session_messages > 20:
-                outcome = 'success'
-            else:
-                outcome = 'partial'
-
-            # Calculate model efficiency (cost-weighted: haiku=1.0, sonnet=0.8, opus=0.5)
-            total_model_calls = sum(session_models.values()) or 1
-            efficiency = (
-                session_models['haiku'] * 1.0 +
-                session_models['sonnet'] * 0.8 +
-                session_models['opus'] * 0.5
-            ) / total_model_calls
-
-            all_sessions.append({
-                "date": session_date,
-                "session_id": str(transcript.stem),
-                "messages": session_messages,
-                "tools": session_tools,
-                "title": first_user_msg[:50] if first_user_msg else None,
-                "intent": first_user_msg[:80] if first_user_msg else None,
-                "outcome": outcome,
-                "model_efficiency": round(efficiency, 2),
-                "models_used": dict(session_models)
-            })
+        # Track longest session
+        if session_messages > longest[0]:
+            longest = (session_messages, session_date, transcript.name[:20])
+
+        # Determine outcome based on session characteristics
+        if has_error:
+            outcome = 'error'
+        elif session_messages < 5:
+            outcome = 'abandoned'
+        elif session_tools > 10:
+            outcome = 'success'
+        elif session_messages > 20:
+            outcome = 'success'
+        else:
+            outcome = 'partial'
+
+        # Calculate model efficiency (cost-weighted: haiku=1.0, sonnet=0.8, opus=0.5)
+        total_model_calls = sum(session_models.values()) or 1
+        efficiency = (
+            session_models.get('haiku', 0) * 1.0 +
+            session_models.get('sonnet', 0) * 0.8 +
+            session_models.get('opus', 0) * 0.5
+        ) / total_model_calls
+
+        all_sessions.append({
+            "date": session_date,
+            "session_id": str(transcript.stem),
+            "messages": session_messages,
+            "tools": session_tools,
+            "title": first_user_msg[:50] if first_user_msg else None,
+            "intent": first_user_msg[:80] if first_user_msg else None,
+            "outcome": outcome,
+            "model_efficiency": round(efficiency, 2),
+            "models_used": dict(session_models)
+        })
 
-    except:
-        pass
+longest_session = {"messageCount": longest[0], "date": longest[1], "sessionId": longest[2]}
 
 log(f"  Sessions: {total_sessions}")
 log(f"  Messages: {total_messages}")
 log(f"  Tools: {total_tools}")
 log(f"  Model usage: {dict(model_counts)}")
 
-# Read REAL token data from TRANSCRIPTS (not cost-tracking.jsonl which has inflated estimates)
-real_tokens = {"cache_read": 0, "input": 0, "cache_create": 0, "output": 0}
-for transcript in PROJECTS_DIR.glob("**/*.jsonl"):
-    try:
-        with open(transcript) as f:
-            for line in f:
-                try:
-                    d = json.loads(line)
-                    usage = d.get('message', {}).get('usage', {})
-                    if usage:
-                        real_tokens["cache_read"] += usage.get('cache_read_input_tokens', 0)
-                        real_tokens["input"] += usage.get('input_tokens', 0)
-                        real_tokens["cache_create"] += usage.get('cache_creation_input_tokens', 0)
-                        real_tokens["output"] += usage.get('output_tokens', 0)
-                except:
-                    pass
-    except:
-        pass
+# Per-family totals, read by most of the steps below
+opus_n = model_counts['opus']
+sonnet_n = model_counts['sonnet']
+haiku_n = model_counts['haiku']
+total_queries = sum(model_counts.values())
 
 log()
 
@@ -217,7 +397,31 @@ log()
 log("STEP 2: Fixing stats-cache.json...")
 
 # Sort daily data chronologically (oldest first) for proper chart display
-sorted_daily = sorted(daily_stats.items())  # All time, chronological
+sorted_days = sorted(daily_sessions)  # All time, chronological
+# Per-day columns in that order, shared by STEP 2 and STEP 4
+daily_rows = list(zip(
+    sorted_days,
+    map(daily_messages.__getitem__, sorted_days),
+    map(daily_sessions.__getitem__, sorted_days),
+    map(daily_tools.__getitem__, sorted_days),
+))
+
+# Both chart series in one pass over the days (chronological order for charts)
+daily_activity = []
+daily_model_tokens = []
+for d, messages, sessions, tools in daily_rows:
+    daily_activity.append({
+        "date": d,
+        "messageCount": messages,
+        "sessionCount": sessions,
+        "toolCallCount": tools
+    })
+    daily_model_tokens.append({
+        "date": d,
+        "tokensByModel": {
+            "opus": messages * 2300  # ~1500 input + 800 output avg
+        }
+    })
 
 stats = {
     "version": 1,
@@ -228,39 +432,23 @@ stats = {
     "modelUsage": {
         "opus": {
             # REAL token data from cost-tracking.jsonl (not estimates)
-            "inputTokens": real_tokens["input"] or model_counts['opus'] * 500,
-            "outputTokens": real_tokens["output"] or model_counts['opus'] * 800,
-            "cacheReadInputTokens": real_tokens["cache_read"] or model_counts['opus'] * 19000,
-            "cacheCreationInputTokens": real_tokens["cache_create"] or model_counts['opus'] * 600
+            "inputTokens": real_tokens["input"] or opus_n * 500,
+            "outputTokens": real_tokens["output"] or opus_n * 800,
+            "cacheReadInputTokens": real_tokens["cache_read"] or opus_n * 19000,
+            "cacheCreationInputTokens": real_tokens["cache_create"] or opus_n * 600
         }
     },
     "hourCounts": dict(hour_counts),  # Activity by hour (0-23)
     "longestSession": longest_session,  # Session with most messages
-    "dailyActivity": [
-        {
-            "date": d,
-            "messageCount": v["messages"],
-            "sessionCount": v["sessions"],
-            "toolCallCount": v["tools"]
-        }
-        for d, v in sorted_daily  # Chronological order for charts
-    ],
-    "dailyModelTokens": [
-        {
-            "date": d,
-            "tokensByModel": {
-                "opus": v["messages"] * 2300  # ~1500 input + 800 output avg
-            }
-        }
-        for d, v in sorted_daily  # Chronological order for charts
-    ],
+    "dailyActivity": daily_activity,
+    "dailyModelTokens": daily_model_tokens,
     "totals": {
         "sessions": total_sessions,
         "messages": total_messages,
         "tools": total_tools
     }
 }
-(CLAUDE_DIR / "stats-cache.json").write_text(json.dumps(stats, indent=2))
+write_json(CLAUDE_DIR / "stats-cache.json", stats)
 log("  ✅ Done")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -275,11 +463,11 @@ if not knowledge_file.exists() or knowledge_file.stat().st_size < 50:
         "facts": [
             {"id": 0, "content": f"Total sessions: {total_sessions}", "tags": ["stats"], "timestamp": datetime.now().isoformat()},
             {"id": 1, "content": f"Total messages: {total_messages}", "tags": ["stats"], "timestamp": datetime.now().isoformat()},
-            {"id": 2, "content": f"Model distribution: Opus {model_counts['opus']}, Sonnet {model_counts['sonnet']}, Haiku {model_counts['haiku']}", "tags": ["models"], "timestamp": datetime.now().isoformat()},
+            {"id": 2, "content": f"Model distribution: Opus {opus_n}, Sonnet {sonnet_n}, Haiku {haiku_n}", "tags": ["models"], "timestamp": datetime.now().isoformat()},
         ],
         "updated": datetime.now().isoformat()
     }
-    knowledge_file.write_text(json.dumps(knowledge, indent=2))
+    write_json(knowledge_file, knowledge)
 log("  ✅ Done")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -289,30 +477,30 @@ log("  ✅ Done")
 log("STEP 4: Fixing activity-timeline.json...")
 
 # Get git commits
-git_commits = defaultdict(int)
+git_commits = Counter()
 git_file = DATA_DIR / "git-activity.jsonl"
 if git_file.exists():
-    with open(git_file) as f:
+    with open(git_file, 'rb') as f:
         for line in f:
             try:
-                e = json.loads(line)
+                e = _loads(line)
                 ts = e.get('ts', 0)
                 if ts:
                     day = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
                     git_commits[day] += 1
-            except:
+            except (ValueError, AttributeError, TypeError, OverflowError, OSError):
                 pass
 
 timeline = {
     "generated": datetime.now().isoformat(),
     "days": [
         (d, {
-            "tools": v["tools"],
-            "sessions": v["sessions"],
-            "messages": v["messages"],
-            "commits": git_commits.get(d, 0)
+            "tools": tools,
+            "sessions": sessions,
+            "messages": messages,
+            "commits": git_commits[d]
         })
-        for d, v in sorted(daily_stats.items(), reverse=True)  # All time
+        for d, messages, sessions, tools in reversed(daily_rows)  # All time
     ],
     "totals": {
         "tools": total_tools,
@@ -321,7 +509,7 @@ timeline = {
         "commits": sum(git_commits.values())
     }
 }
-(KERNEL_DIR / "activity-timeline.json").write_text(json.dumps(timeline, indent=2))
+write_json(KERNEL_DIR / "activity-timeline.json", timeline)
 log("  ✅ Done")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -335,17 +523,17 @@ total_value = sum(model_counts[m] * COSTS_PER_MSG[m] for m in COSTS_PER_MSG)
 
 sub_data = {
     "totalValue": round(total_value, 2),
-    "opusQueries": model_counts['opus'],
-    "sonnetQueries": model_counts['sonnet'],
-    "haikuQueries": model_counts['haiku'],
-    "totalQueries": sum(model_counts.values()),
+    "opusQueries": opus_n,
+    "sonnetQueries": sonnet_n,
+    "haikuQueries": haiku_n,
+    "totalQueries": total_queries,
     "totalSessions": total_sessions,
     "totalMessages": total_messages,
     "monthlySubscription": 200,
     "roiMultiplier": round(total_value / 200, 1) if total_value > 0 else 0,
     "lastUpdated": datetime.now().isoformat()
 }
-(KERNEL_DIR / "subscription-data.json").write_text(json.dumps(sub_data, indent=2))
+write_json(KERNEL_DIR / "subscription-data.json", sub_data)
 log(f"  ✅ Value: ${total_value:,.0f} ({sub_data['roiMultiplier']}x ROI)")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -355,9 +543,12 @@ log(f"  ✅ Value: ${total_value:,.0f} ({sub_data['roiMultiplier']}x ROI)")
 log("STEP 6: Checking dq-scores.jsonl...")
 
 dq_file = KERNEL_DIR / "dq-scores.jsonl"
+dq_data = b''
 dq_count = 0
 if dq_file.exists():
-    dq_count = sum(1 for _ in open(dq_file))
+    # Read once: STEP 7 parses the same bytes, so the count needs no extra pass
+    dq_data = dq_file.read_bytes()
+    dq_count = dq_data.count(b'\n') + (dq_data[-1:] not in (b'', b'\n'))
 log(f"  ✅ {dq_count} entries")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -369,29 +560,28 @@ log("STEP 7: Fixing routing-metrics.jsonl...")
 routing_file = DATA_DIR / "routing-metrics.jsonl"
 entries = []
 
-if dq_file.exists():
-    with open(dq_file) as f:
-        for line in f:
-            try:
-                e = json.loads(line)
-                ts = e.get('ts', 0)
-                if ts:
-                    entries.append({
-                        "ts": ts,
-                        "query": e.get('query', '')[:50],
-                        "predicted_model": e.get('model', 'sonnet'),
-                        "actual_model": e.get('model', 'sonnet'),
-                        "dq_score": e.get('dqScore', 0.5),
-                        "complexity": e.get('complexity', 0.5),
-                        "correct": True,
-                        "latency_ms": 42
-                    })
-            except:
-                pass
+for line in dq_data.splitlines():
+    try:
+        e = _loads(line)
+        ts = e.get('ts', 0)
+        if ts:
+            entries.append({
+                "ts": ts,
+                "query": e.get('query', '')[:50],
+                "predicted_model": e.get('model', 'sonnet'),
+                "actual_model": e.get('model', 'sonnet'),
+                "dq_score": e.get('dqScore', 0.5),
+                "complexity": e.get('complexity', 0.5),
+                "correct": True,
+                "latency_ms": 42
+            })
+    except (ValueError, AttributeError, TypeError, KeyError):
+        pass
 
+# One write for the whole file (empty when there are no entries)
 with open(routing_file, 'w') as f:
-    for e in entries:
-        f.write(json.dumps(e) + '\n')
+    if entries:
+        f.write('\n'.join(map(json.dumps, entries)) + '\n')
 log(f"  ✅ {len(entries)} entries")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -414,7 +604,7 @@ if not patterns_file.exists() or patterns_file.stat().st_size < 50:
         ],
         "lastDetected": datetime.now().isoformat()
     }
-    patterns_file.write_text(json.dumps(patterns, indent=2))
+    write_json(patterns_file, patterns)
 log("  ✅ Done")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -433,7 +623,7 @@ else:
         "minConfidence": 0.9,
         "lastRun": datetime.now().isoformat()
     }
-    coevo_file.write_text(json.dumps(coevo, indent=2))
+    write_json(coevo_file, coevo)
     log("  ✅ Created")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -445,7 +635,7 @@ log("STEP 10: Checking modifications.jsonl...")
 mods_file = KERNEL_DIR / "modifications.jsonl"
 mods_count = 0
 if mods_file.exists():
-    mods_count = sum(1 for _ in open(mods_file))
+    mods_count = count_lines(mods_file)
 log(f"  ✅ {mods_count} entries")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -456,16 +646,16 @@ log("STEP 11: Fixing identity.json...")
 
 identity_file = KERNEL_DIR / "identity.json"
 if identity_file.exists():
-    identity = json.loads(identity_file.read_text())
+    identity = _loads(identity_file.read_bytes())
     identity['statistics'] = {
-        "totalQueries": sum(model_counts.values()),
+        "totalQueries": total_queries,
         "totalSessions": total_sessions,
         "totalMessages": total_messages,
         "totalTools": total_tools,
         "modelBreakdown": dict(model_counts),
         "lastUpdated": datetime.now().isoformat()
     }
-    identity_file.write_text(json.dumps(identity, indent=2))
+    write_json(identity_file, identity)
 log("  ✅ Done")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -480,7 +670,7 @@ tool_summary = {
     "topTools": tool_counts.most_common(20),
     "updated": datetime.now().isoformat()
 }
-(KERNEL_DIR / "tool-summary.json").write_text(json.dumps(tool_summary, indent=2))
+write_json(KERNEL_DIR / "tool-summary.json", tool_summary)
 log(f"  ✅ {tool_summary['totalCalls']} calls")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -491,19 +681,19 @@ log("STEP 13: Fixing cost-summary.json...")
 
 cost_summary = {
     "totalCost": round(total_value, 2),
-    "opusMessages": model_counts['opus'],
-    "sonnetMessages": model_counts['sonnet'],
-    "haikuMessages": model_counts['haiku'],
+    "opusMessages": opus_n,
+    "sonnetMessages": sonnet_n,
+    "haikuMessages": haiku_n,
     "costByModel": {
-        "opus": round(model_counts['opus'] * COSTS_PER_MSG['opus'], 2),
-        "sonnet": round(model_counts['sonnet'] * COSTS_PER_MSG['sonnet'], 2),
-        "haiku": round(model_counts['haiku'] * COSTS_PER_MSG['haiku'], 2)
+        "opus": round(opus_n * COSTS_PER_MSG['opus'], 2),
+        "sonnet": round(sonnet_n * COSTS_PER_MSG['sonnet'], 2),
+        "haiku": round(haiku_n * COSTS_PER_MSG['haiku'], 2)
     },
     "subscription": 200,
     "roiMultiplier": round(total_value / 200, 1),
     "lastUpdated": datetime.now().isoformat()
 }
-(KERNEL_DIR / "cost-summary.json").write_text(json.dumps(cost_summary, indent=2))
+write_json(KERNEL_DIR / "cost-summary.json", cost_summary)
 log(f"  ✅ ${total_value:,.2f} total")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -517,14 +707,14 @@ session_outcomes_file = DATA_DIR / "session-outcomes.jsonl"
 # Load existing quality data before overwriting
 existing_quality = {}
 if session_outcomes_file.exists():
-    with open(session_outcomes_file) as f:
+    with open(session_outcomes_file, 'rb') as f:
         for line in f:
             try:
-                s = json.loads(line)
+                s = _loads(line)
                 sid = s.get('session_id')
                 if sid and s.get('quality'):
                     existing_quality[sid] = s.get('quality')
-            except:
+            except (ValueError, AttributeError, TypeError):
                 pass
 
 def estimate_quality(messages, tools):
@@ -534,15 +724,18 @@ def estimate_quality(messages, tools):
     tool_score = min(2.5, tools / 50)     # Up to 2.5 points for tools
     return round(min(5, max(1, 1 + msg_score + tool_score)), 1)
 
+for session in all_sessions:
+    sid = session.get('session_id')
+    # Preserve existing quality from post-session-analyzer, or estimate
+    session['quality'] = existing_quality.get(sid, estimate_quality(
+        session.get('messages', 0),
+        session.get('tools', 0)
+    ))
+
+# One write for the whole file (empty when there are no sessions)
 with open(session_outcomes_file, 'w') as f:
-    for session in all_sessions:
-        sid = session.get('session_id')
-        # Preserve existing quality from post-session-analyzer, or estimate
-        session['quality'] = existing_quality.get(sid, estimate_quality(
-            session.get('messages', 0),
-            session.get('tools', 0)
-        ))
-        f.write(json.dumps(session) + '\n')
+    if all_sessions:
+        f.write('\n'.join(map(json.dumps, all_sessions)) + '\n')
 
 # Count outcomes
 outcome_counts = Counter(s['outcome'] for s in all_sessions)
@@ -558,8 +751,8 @@ pack_metrics_file = DATA_DIR / "pack-metrics.json"
 pack_metrics = {}
 if pack_metrics_file.exists():
     try:
-        pack_metrics = json.loads(pack_metrics_file.read_text())
-    except:
+        pack_metrics = _loads(pack_metrics_file.read_bytes())
+    except (OSError, ValueError):
         pass
 
 # Calculate daily cost/value from session data
@@ -577,7 +770,7 @@ for session in all_sessions:
 
 # Build daily_trend with cost calculations
 daily_trend = []
-for date in sorted(daily_cost_data.keys()):  # All time
+for date in sorted_days:  # All time (session dates, already sorted in STEP 2)
     d = daily_cost_data[date]
     daily_cost = (d["opus"] * COSTS_PER_MSG["opus"]) + (d["sonnet"] * COSTS_PER_MSG["sonnet"]) + (d["haiku"] * COSTS_PER_MSG["haiku"])
     daily_trend.append({
@@ -596,7 +789,7 @@ pack_metrics["global"]["total_cost_savings"] = round(total_value, 2)
 pack_metrics["status"] = "active"
 pack_metrics["generated"] = datetime.now().isoformat()
 
-pack_metrics_file.write_text(json.dumps(pack_metrics, indent=2))
+write_json(pack_metrics_file, pack_metrics)
 log(f"  ✅ {len(daily_trend)} days of cost data")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -610,19 +803,17 @@ try:
     db = Datastore()
 
     # Sync daily stats
-    for date_str, day_data in daily_stats.items():
-        opus_msgs = sum(1 for s in all_sessions if s.get('date') == date_str and s.get('model') == 'opus')
-        sonnet_msgs = sum(1 for s in all_sessions if s.get('date') == date_str and s.get('model') == 'sonnet')
-        haiku_msgs = sum(1 for s in all_sessions if s.get('date') == date_str and s.get('model') == 'haiku')
+    for date_str, day_sessions in daily_sessions.items():
+        day_messages = daily_messages[date_str]
 
         db.update_daily_stats(
             date=date_str,
-            opus_messages=day_data['messages'] if model_counts['opus'] > model_counts['sonnet'] else 0,
-            sonnet_messages=day_data['messages'] if model_counts['sonnet'] >= model_counts['opus'] else 0,
+            opus_messages=day_messages if opus_n > sonnet_n else 0,
+            sonnet_messages=day_messages if sonnet_n >= opus_n else 0,
             haiku_messages=0,
-            session_count=day_data['sessions'],
-            tool_calls=day_data['tools'],
-            cost_estimate=day_data['messages'] * COSTS_PER_MSG["opus"]  # Mostly Opus
+            session_count=day_sessions,
+            tool_calls=daily_tools[date_str],
+            cost_estimate=day_messages * COSTS_PER_MSG["opus"]  # Mostly Opus
         )
 
     log("  ✅ SQLite synced")
@@ -638,9 +829,9 @@ Summary:
   Sessions:     {total_sessions:,}
   Messages:     {total_messages:,}
   Tools:        {total_tools:,}
-  Opus:         {model_counts['opus']:,}
-  Sonnet:       {model_counts['sonnet']:,}
-  Haiku:        {model_counts['haiku']:,}
+  Opus:         {opus_n:,}
+  Sonnet:       {sonnet_n:,}
+  Haiku:        {haiku_n:,}
   Value:        ${total_value:,.0f}
   ROI:          {total_value/200:.1f}x
 """)
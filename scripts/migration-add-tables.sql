@@ -15,6 +15,7 @@ CREATE TABLE IF NOT EXISTS tool_events (
 CREATE INDEX IF NOT EXISTS idx_tool_events_timestamp ON tool_events(timestamp);
 CREATE INDEX IF NOT EXISTS idx_tool_events_tool_name ON tool_events(tool_name);
 CREATE INDEX IF NOT EXISTS idx_tool_events_success ON tool_events(success);
+CREATE INDEX IF NOT EXISTS idx_tool_ts_name ON tool_events(timestamp, tool_name, success);
 
 -- Raw activity events (replaces activity-events.jsonl)
 CREATE TABLE IF NOT EXISTS activity_events (
@@ -27,6 +28,7 @@ CREATE TABLE IF NOT EXISTS activity_events (
 CREATE INDEX IF NOT EXISTS idx_activity_timestamp ON activity_events(timestamp);
 CREATE INDEX IF NOT EXISTS idx_activity_type ON activity_events(event_type);
 CREATE INDEX IF NOT EXISTS idx_activity_session ON activity_events(session_id);
+CREATE INDEX IF NOT EXISTS idx_activity_ts_type ON activity_events(timestamp, event_type);
 
 -- Raw routing events (replaces routing-decisions.jsonl/routing-feedback.jsonl)
 CREATE TABLE IF NOT EXISTS routing_events (
@@ -41,6 +43,7 @@ CREATE TABLE IF NOT EXISTS routing_events (
 );
 CREATE INDEX IF NOT EXISTS idx_routing_timestamp ON routing_events(timestamp);
 CREATE INDEX IF NOT EXISTS idx_routing_model ON routing_events(chosen_model);
+CREATE INDEX IF NOT EXISTS idx_routing_ts_model ON routing_events(timestamp, chosen_model);
 
 -- Session outcomes (replaces session-outcomes.jsonl)
 CREATE TABLE IF NOT EXISTS session_outcome_events (
@@ -56,6 +59,7 @@ CREATE TABLE IF NOT EXISTS session_outcome_events (
 );
 CREATE INDEX IF NOT EXISTS idx_outcome_timestamp ON session_outcome_events(timestamp);
 CREATE INDEX IF NOT EXISTS idx_outcome_session ON session_outcome_events(session_id);
+CREATE INDEX IF NOT EXISTS idx_outcome_ts_session ON session_outcome_events(timestamp, session_id);
 
 -- Command usage (replaces command-usage.jsonl)
 CREATE TABLE IF NOT EXISTS command_events (